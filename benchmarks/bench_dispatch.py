@@ -0,0 +1,44 @@
+"""Time the per-character cost of each lexer engine on prose, markup and non-ASCII heavy input.
+
+    python -m benchmarks.bench_dispatch --repeat 3
+"""
+import argparse
+import io
+import time
+
+from md_2_html import resources_path
+from md_2_html.lexer import Lexer
+
+INPUTS = {
+	'document2.md': (resources_path / 'document2.md').read_text(encoding='utf-8') * 20,
+	'prose': 'The quick brown fox jumps over the lazy dog while we wait.\n' * 2000,
+	'markup': '# h\n*a* [b](c) ![d](e) `f` ---\n' * 4000,
+	'non-ascii': 'Über schöne Grüße, naïve café — 日本語のテキスト。\n' * 2000,
+}
+
+
+def time_engine(content: str, engine: str, repeat: int) -> float:
+	"""Returns the best time in nanoseconds per character of tokenizing content."""
+	best = float('inf')
+	for _ in range(repeat):
+		lexer = Lexer(io.StringIO(content), engine=engine)
+		start = time.perf_counter_ns()
+		lexer.make_tokens()
+		best = min(best, time.perf_counter_ns() - start)
+
+	return best / len(content)
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best one is reported')
+	args = parser.parse_args()
+
+	for name, content in INPUTS.items():
+		timings = ', '.join(f'{engine} {time_engine(content, engine, args.repeat):6.1f} ns/char'
+			for engine in ('char', 'fast'))
+		print(f'{name:>12}: {timings}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,69 @@
+"""Compare the mmap lexer engine with the open().read() path of the fast engine on a large file.
+
+Each engine runs in its own process so the peak resident memory of one doesn't hide the other.
+
+    python -m benchmarks.bench_mmap --size-mb 128
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from md_2_html import resources_path
+from md_2_html.lexer import Lexer
+
+ENGINES = ('fast', 'mmap')
+
+
+def make_corpus(filename: str, size_mb: int) -> int:
+	"""Write document2.md over and over until the file is size_mb MiB, returns the size in bytes."""
+	block = (resources_path / 'document2.md').read_bytes()
+	with open(filename, 'wb') as f:
+		for _ in range(size_mb * (1 << 20) // len(block) + 1):
+			f.write(block)
+
+	return os.path.getsize(filename)
+
+
+def run_engine(filename: str, engine: str) -> dict:
+	"""Tokenize the file with one engine and return the token count, the time taken and the peak RSS."""
+	start = time.perf_counter()
+	token_count = sum(1 for _ in Lexer(filename, engine=engine).iter_tokens())
+	seconds = time.perf_counter() - start
+
+	peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform != 'darwin':  # kilobytes everywhere but macOS
+		peak_rss *= 1024
+
+	return {'engine': engine, 'tokens': token_count, 'seconds': seconds, 'peak_rss': peak_rss}
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--size-mb', type=int, default=128, help='size of the generated input')
+	parser.add_argument('--run', nargs=2, metavar=('ENGINE', 'FILE'), help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.run:
+		print(json.dumps(run_engine(args.run[1], args.run[0])))
+		return
+
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		filename = os.path.join(tmp_dir, 'corpus.md')
+		size = make_corpus(filename, args.size_mb)
+		print(f'input: {size / (1 << 20):.1f} MiB')
+
+		for engine in ENGINES:
+			output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_mmap', '--run', engine, filename],
+				check=True, capture_output=True, text=True).stdout
+			result = json.loads(output)
+			print(f"{engine:>5}: {result['tokens']} tokens in {result['seconds']:.2f} s, "
+				f"{size / (1 << 20) / result['seconds']:.1f} MiB/s, peak RSS {result['peak_rss'] / (1 << 20):.1f} MiB")
+
+
+if __name__ == '__main__':
+	main()
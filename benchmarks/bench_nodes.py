@@ -0,0 +1,47 @@
+"""Measure the memory the parsed document tree keeps per node, for each corpus mix.
+
+    python -m benchmarks.bench_nodes --size-kb 1024
+"""
+import argparse
+import io
+import tracemalloc
+
+from collections import Counter
+
+from benchmarks import corpus
+from md_2_html.md_parser import Parser
+
+
+def measure(md: str) -> tuple:
+	"""Parse md, returns the node counts of the tree and the bytes the tree keeps."""
+	tracemalloc.start()
+	parser = Parser(io.StringIO(md))
+	parser.parse()
+	parser.lexer = parser.tokens = None  # only the tree is kept
+	kept = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+
+	nodes = Counter()
+	stack = [parser.div]
+	while stack:
+		node = stack.pop()
+		nodes[type(node).__name__] += 1
+		stack.extend(node.child_nodes)
+
+	return nodes, kept
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--size-kb', type=int, default=1024, help='size of the generated input')
+	args = parser.parse_args()
+
+	for kind in corpus.KINDS:
+		nodes, kept = measure(corpus.generate(kind, args.size_kb << 10))
+		count = sum(nodes.values())
+		mix = ', '.join(f'{name} {share}' for name, share in sorted(nodes.items()))
+		print(f'{kind:>8}: {count} nodes ({mix}), {kept / count:.0f} bytes per node')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,43 @@
+"""Measure the memory taken by a token list and by a TokenBuffer per MiB of Markdown input.
+
+    python -m benchmarks.bench_tokens --size-mb 4
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_mmap import make_corpus
+from md_2_html.lexer import Lexer
+
+
+def measure(lexer: Lexer, method: str) -> tuple:
+	"""Call one of the lexer's tokenizing methods, returns the result, the seconds taken and the bytes it keeps."""
+	tracemalloc.start()
+	start = time.perf_counter()
+	tokens = getattr(lexer, method)()
+	seconds = time.perf_counter() - start
+	kept = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+
+	return tokens, seconds, kept
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--size-mb', type=int, default=4, help='size of the generated input')
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		filename = os.path.join(tmp_dir, 'corpus.md')
+		size_mb = make_corpus(filename, args.size_mb) / (1 << 20)
+
+		for method in ('make_tokens', 'make_token_buffer'):
+			tokens, seconds, kept = measure(Lexer(filename), method)
+			print(f'{method:>17}: {len(tokens)} tokens in {seconds:.2f} s, '
+				f'{kept / (1 << 20) / size_mb:.2f} MiB of tokens per MiB of input')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,61 @@
+"""Deterministic synthetic Markdown corpora of a given size and mix."""
+import random
+
+from typing import Callable, Dict
+
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do', 'eiusmod',
+	'tempor', 'incididunt', 'labore', 'magna', 'aliqua', 'veniam', 'quis', 'nostrud', 'exercitation')
+
+
+def _words(rng: random.Random, count: int) -> str:
+	return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def _heading_block(rng: random.Random) -> str:
+	return '#' * rng.randint(1, 6) + ' ' + _words(rng, rng.randint(2, 8)) + '\n\n'
+
+
+def _link_block(rng: random.Random) -> str:
+	link = f'[{_words(rng, 2)}](https://example.com/{rng.choice(WORDS)}.html)'
+	image = f'![{_words(rng, 2)}](https://example.com/{rng.choice(WORDS)}.png)'
+	return f'{_words(rng, 4)} {link} {_words(rng, 3)} {image}\n'
+
+
+def _code_block(rng: random.Random) -> str:
+	return f'{_words(rng, 3)} `{rng.choice(WORDS)}({rng.randint(0, 99)})` {_words(rng, 2)} `a = b`\n'
+
+
+def _nested_block(rng: random.Random) -> str:
+	depth = rng.randint(2, 6)
+	inner = f'[{_words(rng, 2)}](x.md) `{rng.choice(WORDS)}`'
+	for _ in range(depth):
+		inner = f'*{rng.choice(WORDS)} {inner} {rng.choice(WORDS)}*'
+	return '#' * min(depth, 6) + ' ' + inner + '\n' + inner + '\n---\n'
+
+
+def _mixed_block(rng: random.Random) -> str:
+	return rng.choice(BLOCKS[:4])(rng) + _words(rng, rng.randint(5, 20)) + '\n\n'
+
+
+BLOCKS = (_heading_block, _link_block, _code_block, _nested_block, _mixed_block)
+KINDS: Dict[str, Callable[[random.Random], str]] = {
+	'headings': _heading_block,
+	'links': _link_block,
+	'code': _code_block,
+	'nested': _nested_block,
+	'mixed': _mixed_block,
+}
+
+
+def generate(kind: str, size: int, seed: int = 0) -> str:
+	"""Returns about size characters of Markdown made of blocks of one kind, the same for the same seed."""
+	rng = random.Random(seed)
+	make_block = KINDS[kind]
+	blocks = []
+	length = 0
+	while length < size:
+		block = make_block(rng)
+		blocks.append(block)
+		length += len(block)
+
+	return ''.join(blocks)
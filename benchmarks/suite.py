@@ -0,0 +1,117 @@
+"""Time the lexer, the parser and the serializer separately on synthetic corpora.
+
+    python -m benchmarks.suite                                   # print throughput and peak memory
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json  # exit with 1 on a regression
+"""
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks import corpus
+from md_2_html.converter import MD2HTMLConverter
+from md_2_html.lexer import Lexer
+from md_2_html.md_parser import Parser
+
+from typing import Callable, Dict, List
+
+SIZES = {'small': 64 << 10, 'medium': 1 << 20, 'large': 8 << 20}
+STAGES = ('lex', 'parse', 'serialize')
+DEFAULT_TOLERANCE = 0.25  # slowdown allowed before a result counts as a regression
+
+
+def _parse(md: str) -> Parser:
+	parser = Parser(io.StringIO(md))
+	parser.parse()
+
+	return parser
+
+
+def _stage_functions(md: str) -> Dict[str, Callable[[], object]]:
+	"""Returns a function per stage, each one runs only its own stage on md."""
+	converter = MD2HTMLConverter(io.StringIO(md), open_browser=False)
+	converter.render()  # build the tree once, the serialize stage renders it again
+
+	return {
+		'lex': lambda: Lexer(io.StringIO(md)).make_tokens(),
+		'parse': lambda: _parse(md),
+		'serialize': converter.render,
+	}
+
+
+def _measure(function: Callable[[], object], repeat: int) -> Dict[str, float]:
+	"""Returns the best time of repeat runs and the peak memory of a separate, traced run."""
+	best = float('inf')
+	for _ in range(repeat):
+		start = time.perf_counter()
+		function()
+		best = min(best, time.perf_counter() - start)
+
+	tracemalloc.start()
+	function()
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+
+	return {'seconds': best, 'peak_bytes': peak}
+
+
+def run_suite(sizes: Dict[str, int] = None, kinds: List[str] = None, repeat: int = 3) -> Dict[str, dict]:
+	"""Run every stage on every corpus, keyed by 'kind/size/stage'."""
+	results = {}
+	for size_name, size in (sizes or SIZES).items():
+		for kind in kinds or corpus.KINDS:
+			md = corpus.generate(kind, size)
+			megabytes = len(md.encode('utf-8')) / (1 << 20)
+			for stage, function in _stage_functions(md).items():
+				result = _measure(function, repeat)
+				result['mb_per_s'] = megabytes / result['seconds']
+				results[f'{kind}/{size_name}/{stage}'] = result
+
+	return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+	"""Returns a message for each result that is more than tolerance slower than its baseline."""
+	regressions = []
+	for name, result in results.items():
+		if name not in baseline:
+			continue
+		expected = baseline[name]['mb_per_s']
+		if result['mb_per_s'] < expected * (1 - tolerance):
+			regressions.append(f'{name}: {result["mb_per_s"]:.2f} MB/s, baseline {expected:.2f} MB/s')
+
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--sizes', nargs='+', choices=SIZES, default=list(SIZES), help='corpus sizes to run')
+	parser.add_argument('--kinds', nargs='+', choices=corpus.KINDS, default=list(corpus.KINDS), help='corpus mixes')
+	parser.add_argument('--repeat', type=int, default=3, help='timed runs per measurement, the best one is kept')
+	parser.add_argument('--baseline', help='JSON file of earlier results to compare against')
+	parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='allowed slowdown (0.25 = 25%%)')
+	parser.add_argument('--save-baseline', help='write the results to this JSON file')
+	args = parser.parse_args()
+
+	results = run_suite({name: SIZES[name] for name in args.sizes}, args.kinds, args.repeat)
+	for name, result in results.items():
+		print(f'{name:>28}: {result["mb_per_s"]:8.2f} MB/s, peak {result["peak_bytes"] / (1 << 20):8.2f} MiB')
+
+	if args.save_baseline:
+		with open(args.save_baseline, 'w') as f:
+			json.dump(results, f, indent=1, sort_keys=True)
+
+	if args.baseline:
+		with open(args.baseline) as f:
+			regressions = compare(results, json.load(f), args.tolerance)
+		for regression in regressions:
+			print(f'REGRESSION {regression}', file=sys.stderr)
+		if regressions:
+			sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
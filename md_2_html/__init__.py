@@ -1,11 +1,40 @@
 from pathlib import Path
-# below solution from: https://github.com/python-poetry/poetry/pull/2366#issuecomment-652418094
-try:
-    import importlib.metadata as importlib_metadata
-except ModuleNotFoundError:
-    import importlib_metadata
-
-__version__ = importlib_metadata.version(__name__)
 
 assets_path = Path(__file__).parent / 'assets'
-resources_path = Path(__file__).parent / 'resources'
\ No newline at end of file
+resources_path = Path(__file__).parent / 'resources'
+
+# The public conversion API, imported on first use so `import md_2_html` stays cheap.
+_LAZY_ATTRIBUTES = {
+    'convert_string': 'md_2_html.converter',
+    'convert_bytes': 'md_2_html.converter',
+    'RenderCache': 'md_2_html.cache',
+}
+
+
+def _version() -> str:
+    # below solution from: https://github.com/python-poetry/poetry/pull/2366#issuecomment-652418094
+    try:
+        import importlib.metadata as importlib_metadata
+    except ModuleNotFoundError:
+        import importlib_metadata
+
+    return importlib_metadata.version(__name__)
+
+
+def __getattr__(name: str):
+    """Look up __version__ and the conversion API the first time they are used."""
+    if name == '__version__':
+        value = _version()
+    elif name in _LAZY_ATTRIBUTES:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value  # later lookups don't come through here
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + ['__version__'] + list(_LAZY_ATTRIBUTES))
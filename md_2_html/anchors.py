@@ -0,0 +1,97 @@
+"""Heading anchors and internal links of the documents of a site, indexed so links can be checked without parsing."""
+import posixpath
+import re
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+from typing import Dict, Iterable, List, NamedTuple, NoReturn, Optional, Set
+
+_SLUG_DROP = re.compile(r'[^\w\- ]')
+LINKED_SUFFIXES = ('.md', '.html')  # links to other files, images for one, aren't checked
+
+
+class DeadLink(NamedTuple):
+	"""A link of the source document that leads nowhere, reason says why."""
+	source: str
+	href: str
+	reason: str
+
+
+def slugify(text: str) -> str:
+	"""Returns the anchor of a heading like GitHub makes it: lower case, punctuation dropped, spaces as dashes."""
+	return _SLUG_DROP.sub('', text.strip().lower()).replace(' ', '-') or 'section'
+
+
+def unique_slug(text: str, seen: Dict[str, int]) -> str:
+	"""Returns the slug of text, numbered if the document has that slug already; seen counts them."""
+	slug = slugify(text)
+	count = seen.get(slug, 0)
+	seen[slug] = count + 1
+
+	return f'{slug}-{count}' if count else slug
+
+
+def is_local(href: str) -> bool:
+	"""Returns whether href leads to a document of the same site, by a path relative to the linking one."""
+	parts = urlsplit(href)
+	return not parts.scheme and not parts.netloc and not parts.path.startswith('/')
+
+
+def rewrite_link(href: str) -> str:
+	"""Returns href with a local .md file linked as its converted .html file, other links are kept."""
+	parts = urlsplit(href)
+	if not is_local(href) or not parts.path.endswith('.md'):
+		return href
+
+	return urlunsplit(parts._replace(path=parts.path[:-len('.md')] + '.html'))
+
+
+class AnchorIndex():
+	"""The anchors and local links of each document, by its POSIX path relative to the source directory."""
+
+	def __init__(self):
+		self.anchors: Dict[str, Set[str]] = {}
+		self.links: Dict[str, List[str]] = {}
+
+	@classmethod
+	def from_entries(cls, entries: Dict[str, dict]) -> 'AnchorIndex':
+		"""Build the index from manifest entries, those converted without anchors are left out."""
+		index = cls()
+		for key, entry in entries.items():
+			if 'anchors' in entry:
+				index.add(key, entry['anchors'], entry['links'])
+
+		return index
+
+	def add(self, key: str, anchors: Iterable[str], links: Iterable[str]) -> NoReturn:
+		"""Add or replace the anchors and local links of a document."""
+		self.anchors[key] = set(anchors)
+		self.links[key] = list(links)
+
+	def check(self, key: str, href: str) -> Optional[str]:
+		"""Returns why a local link of the document key is dead, None if it resolves."""
+		parts = urlsplit(href)
+		target = key
+		if parts.path:
+			path = posixpath.normpath(posixpath.join(posixpath.dirname(key), unquote(parts.path)))
+			stem, suffix = posixpath.splitext(path)
+			if suffix not in LINKED_SUFFIXES:
+				return None
+			target = stem + '.md'
+			if target not in self.anchors:
+				return 'no such document'
+
+		if parts.fragment and unquote(parts.fragment) not in self.anchors[target]:
+			return 'no such anchor'
+
+		return None
+
+	def dead_links(self) -> List[DeadLink]:
+		"""Returns the links of every document that lead nowhere, in document order."""
+		dead = []
+		for key in sorted(self.links):
+			for href in self.links[key]:
+				reason = self.check(key, href)
+				if reason is not None:
+					dead.append(DeadLink(key, href, reason))
+
+		return dead
@@ -0,0 +1,43 @@
+from md_2_html.converter import MD2HTMLConverter, convert_string
+from concurrent.futures import Executor
+from functools import partial
+import asyncio
+
+from typing import Iterable, List
+
+DEFAULT_LIMIT = 4  # conversions running at once in convert_many_async
+
+
+def _convert_file(filename: str, **options) -> str:
+	"""Convert a file and return the name of the HTML file, runs in the executor."""
+	converter = MD2HTMLConverter(filename, open_browser=False, **options)
+	converter.convert()
+
+	return converter.html_filename
+
+
+async def convert_async(filename: str, executor: Executor = None, **options) -> str:
+	"""Convert a markdown file in an executor without blocking the event loop, returns the HTML file name.
+
+	The default executor of the loop is used if none is given, a ProcessPoolExecutor converts on other cores.
+	"""
+	loop = asyncio.get_running_loop()
+	return await loop.run_in_executor(executor, partial(_convert_file, filename, **options))
+
+
+async def convert_string_async(md: str, executor: Executor = None, **options) -> str:
+	"""Convert markdown text in an executor without blocking the event loop, returns the HTML."""
+	loop = asyncio.get_running_loop()
+	return await loop.run_in_executor(executor, partial(convert_string, md, **options))
+
+
+async def convert_many_async(filenames: Iterable[str], limit: int = DEFAULT_LIMIT, executor: Executor = None,
+		**options) -> List[str]:
+	"""Convert many markdown files with at most limit conversions at once, returns the HTML file names in order."""
+	semaphore = asyncio.Semaphore(limit)
+
+	async def convert_one(filename: str) -> str:
+		async with semaphore:
+			return await convert_async(filename, executor, **options)
+
+	return await asyncio.gather(*(convert_one(filename) for filename in filenames))
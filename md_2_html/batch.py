@@ -0,0 +1,235 @@
+from md_2_html.anchors import AnchorIndex
+from md_2_html.converter import MD2HTMLConverter
+from md_2_html.manifest import BuildManifest, options_fingerprint, source_info
+from md_2_html.sinks import OutputSink, is_archive, open_sink
+from md_2_html.stats import ConversionStats
+from md_2_html.stylesheet import stylesheet, stylesheet_name, write_stylesheet
+import md_2_html
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+import os
+import posixpath
+
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+DEFAULT_CHUNKSIZE = 16  # files handed to a worker process at a time
+
+# Build result statuses.
+CONVERTED = 'converted'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+PRUNED = 'pruned'
+
+
+class BuildResult(NamedTuple):
+	"""The outcome for one file in a batch build, error is set if it failed and stats if they were collected.
+
+	With anchors, index holds the 'anchors' and 'links' of the converted file. source_info is the hash, size
+	and mtime of the bytes that were converted, None if the file changed while it was.
+	"""
+	source: str
+	output: str
+	error: Optional[str] = None
+	status: str = CONVERTED
+	stats: Optional[dict] = None
+	index: Optional[dict] = None
+	source_info: Optional[dict] = None
+
+
+def find_markdown_files(src_dir: str) -> List[Path]:
+	"""Returns every .md file under src_dir, in a stable order."""
+	return sorted(path for path in Path(src_dir).rglob('*.md') if path.is_file())
+
+
+def output_path(source: Path, src_dir: str, out_dir: str) -> Path:
+	"""Returns where the HTML of source goes, mirroring its place under src_dir in out_dir."""
+	return Path(out_dir) / source.relative_to(src_dir).with_suffix('.html')
+
+
+def _index(converter: MD2HTMLConverter) -> Optional[dict]:
+	"""Returns the anchors and local links the converter's parser collected, if it did."""
+	parser = converter.parser
+	if parser.anchors is None:
+		return None
+
+	return {'anchors': parser.anchors, 'links': parser.links}
+
+
+def convert_file(job: Tuple[str, str, dict, bool]) -> BuildResult:
+	"""Convert one (source, output, options, collect_stats) job, an exception is reported in the result instead of raised.
+
+	The options are keyword arguments of MD2HTMLConverter.
+	"""
+	source, output, options, collect_stats = job
+	stats = ConversionStats() if collect_stats else None
+	try:
+		stat = os.stat(source)  # before reading, so a save while converting shows up as a newer mtime
+		Path(output).parent.mkdir(parents=True, exist_ok=True)
+		converter = MD2HTMLConverter(source, open_browser=False, html_filename=output, stats=stats, **options)
+		converter.convert()
+		info = source_info(source, stat)
+	except Exception as e:
+		return BuildResult(source, output, f'{type(e).__name__}: {e}', FAILED)
+
+	return BuildResult(source, output, stats=stats.to_dict() if collect_stats else None, index=_index(converter),
+		source_info=info)
+
+
+def render_page(job: Tuple[str, str, dict, bool]) -> Tuple[BuildResult, Optional[bytes]]:
+	"""Render one (source, name, options, collect_stats) job to encoded HTML instead of writing it, see convert_file."""
+	source, name, options, collect_stats = job
+	stats = ConversionStats() if collect_stats else None
+	try:
+		converter = MD2HTMLConverter(source, open_browser=False, stats=stats, **options)
+		html = converter.render()
+	except Exception as e:
+		return BuildResult(source, name, f'{type(e).__name__}: {e}', FAILED), None
+
+	result = BuildResult(source, name, stats=stats.to_dict() if collect_stats else None, index=_index(converter))
+	return result, html.encode('utf-8')
+
+
+def _write_pages(sink: OutputSink, rendered: Iterable[Tuple[BuildResult, Optional[bytes]]]) -> List[BuildResult]:
+	"""Write the rendered pages into the sink as they come, returns their results."""
+	results = []
+	for result, data in rendered:
+		if data is not None:
+			sink.write(result.output, data)
+		results.append(result)
+
+	return results
+
+
+def _converter_options(engine: str, css: str, bootstrap: Optional[str], anchors: bool) -> dict:
+	"""Returns the MD2HTMLConverter options every page of a build is converted with, the stylesheet href aside."""
+	options = {'engine': engine, 'css': css}
+	if css != 'cdn':
+		options['bootstrap'] = bootstrap
+	if anchors:  # left out otherwise, so the manifest fingerprints of builds without anchors stay the same
+		options['anchors'] = True
+
+	return options
+
+
+def build_to_sink(src_dir: str, sink: OutputSink, workers: int = None, chunksize: int = DEFAULT_CHUNKSIZE,
+		engine: str = 'fast', collect_stats: bool = False, css: str = 'cdn', bootstrap: str = None,
+		anchors: bool = False) -> List[BuildResult]:
+	"""Convert every .md file under src_dir into a sink, see build for the options.
+
+	The workers only render, this process is the single writer: it writes the pages in order as they come
+	back, so a sink such as an archive is written sequentially. Every file is converted, the results' outputs
+	are the names of the pages in the sink.
+	"""
+	options = _converter_options(engine, css, bootstrap, anchors)
+	if css == 'shared':
+		stylesheet_path = stylesheet_name(bootstrap)
+		sink.write(stylesheet_path, stylesheet(bootstrap).encode('utf-8'))
+
+	jobs = []
+	for source in find_markdown_files(src_dir):
+		name = source.relative_to(src_dir).with_suffix('.html').as_posix()
+		job_options = options
+		if css == 'shared':
+			job_options = dict(options, stylesheet=posixpath.relpath(stylesheet_path, PurePosixPath(name).parent))
+		jobs.append((str(source), name, job_options, collect_stats))
+
+	if workers == 1:
+		return _write_pages(sink, map(render_page, jobs))
+
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		return _write_pages(sink, executor.map(render_page, jobs, chunksize=chunksize))
+
+
+def _prune(manifest: BuildManifest, src_dir: str, keys: set) -> List[BuildResult]:
+	"""Delete the outputs of manifest entries whose source is gone."""
+	results = []
+	for key in sorted(set(manifest.entries) - keys):
+		output = manifest.forget(key)['output']
+		if os.path.exists(output):
+			os.remove(output)
+		results.append(BuildResult(str(Path(src_dir) / key), output, status=PRUNED))
+
+	return results
+
+
+def build(src_dir: str, out_dir: str, workers: int = None, chunksize: int = DEFAULT_CHUNKSIZE,
+		engine: str = 'fast', incremental: bool = True, collect_stats: bool = False, css: str = 'cdn',
+		bootstrap: str = None, anchors: bool = False) -> List[BuildResult]:
+	"""Convert every .md file under src_dir into out_dir across a pool of worker processes.
+
+	workers defaults to the number of CPUs, with 1 the files are converted in this process. If incremental is
+	set, files that are unchanged since the last build (per the manifest in out_dir) are skipped. The outputs
+	of files deleted since the last build are removed either way. With collect_stats, each converted file's
+	result carries its ConversionStats.to_dict(). With css='shared' the stylesheet is written once into
+	out_dir and every page links it.
+
+	If out_dir ends in .zip, .tar, .tar.gz, .tgz, .tar.bz2 or .tar.xz, the site is written into that one
+	archive by build_to_sink instead, always in full and without a manifest. A directory isn't written through
+	a DirectorySink: each worker streams its pages straight into their files, so no page is sent back to this
+	process or held in memory whole, and unchanged pages are left in place.
+
+	With anchors, headings get slug ids, links to .md files lead to the .html files, and each file's anchors
+	and local links are recorded in the manifest, so link_index covers unchanged files without parsing them.
+	"""
+	if is_archive(out_dir):
+		with open_sink(out_dir) as sink:
+			return build_to_sink(src_dir, sink, workers, chunksize, engine, collect_stats, css, bootstrap, anchors)
+
+	version = md_2_html.__version__
+	options = _converter_options(engine, css, bootstrap, anchors)
+	fingerprint = options_fingerprint(dict(options, stylesheet=stylesheet_name(bootstrap) if css != 'cdn' else None))
+	manifest = BuildManifest.load(out_dir)
+	if css == 'shared':
+		stylesheet_path = write_stylesheet(out_dir, bootstrap)
+
+	results = []
+	jobs = []
+	keys = {}
+	for source in find_markdown_files(src_dir):
+		key = source.relative_to(src_dir).as_posix()
+		output = str(output_path(source, src_dir, out_dir))
+		keys[str(source)] = key
+		if incremental and manifest.lookup(key, str(source), version, fingerprint) is not None:
+			results.append(BuildResult(str(source), output, status=UNCHANGED))
+		else:
+			job_options = options
+			if css == 'shared':  # linked relative to the page, so out_dir can be moved or served from anywhere
+				href = Path(os.path.relpath(stylesheet_path, Path(output).parent)).as_posix()
+				job_options = dict(options, stylesheet=href)
+			jobs.append((str(source), output, job_options, collect_stats))
+
+	results.extend(_prune(manifest, src_dir, set(keys.values())))
+
+	if workers == 1:
+		converted = [convert_file(job) for job in jobs]
+	else:
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			converted = list(executor.map(convert_file, jobs, chunksize=chunksize))
+
+	for result in converted:
+		if result.source_info is not None:
+			manifest.record(keys[result.source], result.source_info, result.output, version, fingerprint, result.index)
+		else:
+			manifest.forget(keys[result.source])  # so it's retried next time
+	results.extend(converted)
+
+	Path(out_dir).mkdir(parents=True, exist_ok=True)
+	manifest.save()
+
+	return results
+
+
+def link_index(out_dir: str, results: List[BuildResult]) -> AnchorIndex:
+	"""Returns the anchor index of the last build with anchors into out_dir, with all its files.
+
+	It comes from the manifest of a directory, and from the results of an archive, which are all converted.
+	"""
+	if not is_archive(out_dir):
+		return AnchorIndex.from_entries(BuildManifest.load(out_dir).entries)
+
+	index = AnchorIndex()
+	for result in results:
+		if result.index is not None:
+			index.add(PurePosixPath(result.output).with_suffix('.md').as_posix(), **result.index)
+
+	return index
@@ -0,0 +1,76 @@
+"""Markdown split into blocks that are parsed and rendered on their own, with the same result as the whole text."""
+import io
+import re
+
+from md_2_html.lexer import BLANK_LOOKAHEAD, Lexer
+from md_2_html.md_parser import Parser
+
+from typing import Iterator, List, Optional
+
+# Where a block may end: blank lines the lexer ends a paragraph at, and the new line before a heading. Both start
+# with a new line, so the regex engine only stops at those.
+_CUTS = re.compile(r'\n(?:(?P<blank>(?:[ \t]*\n)+)' + BLANK_LOOKAHEAD + r'|(?=#))')
+
+
+def iter_blocks(md: str, min_size: int = 0) -> Iterator[str]:
+	"""Yield the blocks of md, split where the lexer ends paragraphs: at blank lines and before headings.
+
+	Nothing the parser keeps open crosses these places, so rendering the blocks one by one and joining the
+	markup gives the markup of the whole text. Each block is the text the lexer reads there without the new
+	line after it, which render_block adds back. Blocks are only cut once they are min_size characters long,
+	so they can be as large as wanted. Blocks of white space only are left out.
+
+	The places are found by a scan for new lines, without lexing. Only inline code crosses a line and only an
+	image takes the new line ending its own, so a block with a ` or a last line with a ! is cut where the
+	token pattern, run from the line of the first ` or of the !, has a blank or heading match starting there.
+	"""
+	content = md.rstrip() + "\n"
+	start = searched = 0
+	tick = -1  # the first ` of the block, -1 if there is none before searched
+	tokens = token = None  # the token matches from a line of the block, run once the scan can't cut on its own
+	for cut in _CUTS.finditer(content):
+		end = cut.start()  # the block ends before the new line, the lexer adds it back
+		if end - start < min_size:
+			continue
+
+		if tick == -1:
+			tick = content.find('`', searched, end)
+			searched = end
+		blank = cut.lastgroup == 'blank'
+		line = max(content.rfind('\n', start, end) + 1, start)
+		if tick != -1 or (blank and content.find('!', line, end) != -1):
+			if tokens is None:
+				# Every token before the first ` ends on its line, so a token starts at the line of the ` or !.
+				first = max(content.rfind('\n', start, tick) + 1, start) if tick != -1 else line
+				tokens = Lexer.token_pattern().finditer(content, first)
+				token = next(tokens, None)
+			at = end if blank else cut.end()  # where the blank lines or the heading token has to start
+			while token is not None and token.start() < at:
+				token = next(tokens, None)
+			if token is None or token.start() != at or token.lastgroup != ('blank' if blank else 'heading'):
+				continue
+		else:
+			tokens = None
+
+		block = content[start:end]
+		if block and not block.isspace():
+			yield block
+		start = searched = cut.end()
+		tick = -1
+
+	block = content[start:-1]
+	if block and not block.isspace():
+		yield block
+
+
+def split_blocks(md: str, min_size: int = 0) -> List[str]:
+	"""Returns the blocks of md as a list, see iter_blocks."""
+	return list(iter_blocks(md, min_size))
+
+
+def render_block(block: str, pretty: bool = True, level: Optional[int] = 0, engine: str = 'fast') -> str:
+	"""Parse a block and render its nodes as they are rendered inside the main div, at the given level."""
+	parser = Parser(io.StringIO(block), engine, strip=False)
+	parser.parse()
+
+	return ''.join(node.render(pretty, level) for node in parser.div.child_nodes)
@@ -0,0 +1,101 @@
+from md_2_html.converter import convert_string
+from md_2_html.manifest import options_fingerprint
+from collections import OrderedDict
+import hashlib
+import sys
+import threading
+
+from typing import TYPE_CHECKING, NoReturn, Optional
+
+if TYPE_CHECKING:
+	from md_2_html.stats import ConversionStats
+
+
+class RenderCache():
+	"""A thread-safe LRU cache in front of convert_string, keyed by a hash of the markdown and the options.
+
+	Two threads that miss on the same document at once both render it, the result is the same either way.
+	"""
+
+	def __init__(self, max_entries: int = 1024, max_bytes: int = 64 << 20):
+		"""Initialize an empty cache bounded by number of entries and by the memory the rendered HTML takes."""
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+
+		self._entries = OrderedDict()  # key -> HTML, least recently used first
+		self._lock = threading.Lock()
+		self.size_bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	@staticmethod
+	def make_key(md: str, **options) -> bytes:
+		"""Returns the cache key of a document, options that only differ in order give the same key."""
+		digest = hashlib.blake2b(md.encode('utf-8', 'surrogatepass'), digest_size=16)
+		digest.update(options_fingerprint(options).encode('ascii'))
+
+		return digest.digest()
+
+	def get(self, key: bytes) -> Optional[str]:
+		"""Returns the cached HTML of a key and marks it as recently used, or None."""
+		with self._lock:
+			html = self._entries.get(key)
+			if html is None:
+				self.misses += 1
+			else:
+				self.hits += 1
+				self._entries.move_to_end(key)
+
+		return html
+
+	def put(self, key: bytes, html: str) -> NoReturn:
+		"""Cache HTML under a key, evicting the least recently used entries to stay within bounds."""
+		size = sys.getsizeof(html)
+		if size > self.max_bytes:
+			return
+
+		with self._lock:
+			old = self._entries.pop(key, None)
+			if old is not None:
+				self.size_bytes -= sys.getsizeof(old)
+
+			self._entries[key] = html
+			self.size_bytes += size
+			while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+				_, evicted = self._entries.popitem(last=False)
+				self.size_bytes -= sys.getsizeof(evicted)
+				self.evictions += 1
+
+	def render(self, md: str, stats: 'ConversionStats' = None, **options) -> str:
+		"""Returns the HTML of a markdown document, converting it only if it isn't cached.
+
+		The stats aren't part of the key, they only count conversions: a cache hit adds nothing to them.
+		"""
+		key = self.make_key(md, **options)
+		html = self.get(key)
+		if html is None:
+			html = convert_string(md, stats=stats, **options)
+			self.put(key, html)
+
+		return html
+
+	def clear(self) -> NoReturn:
+		"""Remove every entry, the counters are kept."""
+		with self._lock:
+			self._entries.clear()
+			self.size_bytes = 0
+
+	def stats(self) -> dict:
+		"""Returns the counters and the current size of the cache."""
+		with self._lock:
+			return {
+				'entries': len(self._entries),
+				'bytes': self.size_bytes,
+				'hits': self.hits,
+				'misses': self.misses,
+				'evictions': self.evictions,
+			}
+
+	def __len__(self):
+		return len(self._entries)
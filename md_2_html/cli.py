@@ -0,0 +1,116 @@
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+from md_2_html import batch
+from md_2_html.lexer import Lexer
+from md_2_html.stats import ConversionStats
+from md_2_html.stylesheet import CSS_MODES
+from md_2_html.watch import DEFAULT_INTERVAL, Watcher
+
+from typing import List, NoReturn
+
+
+def build_cmd(args: argparse.Namespace) -> int:
+	"""Convert a whole directory tree, returns 1 if any file failed."""
+	results = batch.build(args.src_dir, args.out_dir, args.workers, args.chunksize, args.engine,
+		incremental=not args.force, collect_stats=args.stats is not None, css=args.css, bootstrap=args.bootstrap,
+		anchors=args.anchors)
+	if args.stats is not None:
+		write_stats(args.stats, results)
+	if args.anchors:
+		for dead in batch.link_index(args.out_dir, results).dead_links():
+			print(f'{dead.source}: dead link {dead.href} ({dead.reason})', file=sys.stderr)
+
+	counts = Counter(result.status for result in results)
+	for result in results:
+		if result.status == batch.FAILED:
+			print(f'{result.source}: {result.error}', file=sys.stderr)
+	print(f'Converted {counts[batch.CONVERTED]} of {counts[batch.CONVERTED] + counts[batch.FAILED]} files, '
+		f'{counts[batch.UNCHANGED]} unchanged, {counts[batch.PRUNED]} removed.')
+
+	return 1 if counts[batch.FAILED] else 0
+
+
+def watch_cmd(args: argparse.Namespace) -> int:
+	"""Convert files whenever they change until interrupted."""
+	watcher = Watcher(args.files, engine=args.engine, css=args.css, bootstrap=args.bootstrap)
+
+	def report(filename: str, rendered: int) -> NoReturn:
+		print(f'{filename}: {rendered} of {len(watcher.documents[filename].blocks)} blocks rendered')
+
+	for filename, rendered in watcher.poll():
+		report(filename, rendered)
+		if args.open:
+			import webbrowser  # only needed here
+
+			webbrowser.open(Path(Watcher.html_filename(filename)).resolve().as_uri())
+
+	try:
+		watcher.watch(args.interval, on_convert=report)
+	except KeyboardInterrupt:
+		pass
+
+	return 0
+
+
+def write_stats(filename: str, results: List[batch.BuildResult]) -> NoReturn:
+	"""Write the stats of every converted file and their total as JSON."""
+	total = ConversionStats()
+	files = {}
+	for result in results:
+		if result.stats is not None:
+			total.merge(result.stats)
+			files[result.source] = result.stats
+
+	with open(filename, 'w', encoding='utf-8') as f:
+		json.dump({'total': total.to_dict(), 'files': files}, f, indent=1, sort_keys=True)
+
+
+def make_parser() -> argparse.ArgumentParser:
+	"""Make the argument parser of the md2html command."""
+	parser = argparse.ArgumentParser(prog='md2html', description='Markdown to HTML converter.')
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	build = commands.add_parser('build', help='convert every .md file under a directory')
+	build.add_argument('src_dir', help='directory searched for .md files')
+	build.add_argument('out_dir',
+		help='directory the .html files are written to, or a .zip, .tar, .tar.gz, .tar.bz2 or .tar.xz archive of them')
+	build.add_argument('-j', '--workers', type=int, default=None,
+		help='number of worker processes (default: number of CPUs)')
+	build.add_argument('--chunksize', type=int, default=batch.DEFAULT_CHUNKSIZE,
+		help='files handed to a worker at a time (default: %(default)s)')
+	build.add_argument('--engine', choices=Lexer.ENGINES, default='fast', help='lexer engine (default: %(default)s)')
+	build.add_argument('--css', choices=CSS_MODES, default='cdn',
+		help='link the styles online (cdn), inline them in each page, or write them once for all pages to share '
+		'(default: %(default)s)')
+	build.add_argument('--bootstrap', metavar='FILE', help='local Bootstrap CSS to include with --css inline or shared')
+	build.add_argument('--anchors', action='store_true',
+		help='give headings slug ids, link .md files as their .html files and report dead local links')
+	build.add_argument('--stats', metavar='FILE', help='write per-stage timings and counters as JSON to FILE')
+	build.add_argument('--force', action='store_true',
+		help='convert all files, even those unchanged since the last build (archives are always built in full)')
+	build.set_defaults(func=build_cmd)
+
+	watch = commands.add_parser('watch', help='convert .md files again whenever they change')
+	watch.add_argument('files', nargs='+', help='.md files to watch, each is written next to it as .html')
+	watch.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+		help='seconds between two checks of the files (default: %(default)s)')
+	watch.add_argument('--open', action='store_true', help='open the converted files in the web browser')
+	watch.add_argument('--engine', choices=Lexer.ENGINES, default='fast', help='lexer engine (default: %(default)s)')
+	watch.add_argument('--css', choices=CSS_MODES, default='cdn', help='see build (default: %(default)s)')
+	watch.add_argument('--bootstrap', metavar='FILE', help='local Bootstrap CSS to include with --css inline or shared')
+	watch.set_defaults(func=watch_cmd)
+
+	return parser
+
+
+def main(argv: List[str] = None) -> int:
+	args = make_parser().parse_args(argv)
+	return args.func(args)
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,63 +1,148 @@
 from md_2_html.md_parser import Parser
-from md_2_html.html_tag import HtmlTag, VoidHtmlTag
-from md_2_html import resources_path
-import webbrowser
+from md_2_html.shell import DocumentShell, document_shell
+from md_2_html.stylesheet import CSS_MODES, write_stylesheet
+from pathlib import Path
+import io
 import os
 
-from typing import NoReturn, Tuple
+from typing import TYPE_CHECKING, Iterator, NoReturn, Optional, TextIO, Union
+
+if TYPE_CHECKING:
+	from md_2_html.stats import ConversionStats
+
+WRITE_BUFFER_SIZE = 1 << 16  # flush the rendered HTML to disk in 64 KiB blocks
 
 
 class MD2HTMLConverter():
 	"""A class that converts markdown files to HTML5."""
 
-	def __init__(self, filename: str, open_browser: bool = True):
-		"""Initialize the converter with a file."""
+	def __init__(self, filename: Union[str, TextIO], open_browser: bool = True, engine: str = 'fast',
+			html_filename: str = None, pretty: bool = True, stats: 'ConversionStats' = None, css: str = 'cdn',
+			stylesheet: str = None, bootstrap: str = None, workers: Optional[int] = 1, anchors: bool = False):
+		"""Initialize the converter with a file, engine='stream' reads it while converting.
+
+		The HTML is written next to the file unless html_filename is given. A text stream can be converted
+		too, but then convert() needs an html_filename; render() doesn't. If stats are given, the conversion
+		is timed and counted into them.
+
+		css='inline' and css='shared' style the page without the network, with the packaged styles and the
+		local Bootstrap file if one is given. The shared stylesheet is linked at the stylesheet href, if there
+		is none convert() writes it next to the HTML file.
+
+		With more than one worker (None for one per CPU), blocks of the file are lexed, parsed and rendered in
+		that many processes, for the same HTML. Tokens and nodes are not counted into the stats then, and the
+		time spent goes to the render stage.
+
+		With anchors, headings get slug ids and links to .md files lead to the .html files, see Parser. The
+		parser's anchors and links are filled in then, which needs a single worker.
+		"""
+		if css not in CSS_MODES:
+			raise ValueError(f"Unknown css mode '{css}', expected one of {CSS_MODES}.")
+		if anchors and workers != 1:
+			raise ValueError("Anchors are collected by a single parser, they need workers=1.")
 		self.filename = filename
-		self.html_filename = filename.replace('.md', '.html')
+		if html_filename is None and isinstance(filename, str):
+			html_filename = filename.replace('.md', '.html')
+		self.html_filename = html_filename
 
 		self.open_browser = open_browser
+		self.pretty = pretty
+		self.stats = stats
+		self.css = css
+		self.stylesheet = stylesheet
+		self.bootstrap = bootstrap
+		self.workers = workers
+
+		self.parser = Parser(filename, engine, anchors)
+		self.shell: DocumentShell = None
+		self._built = False
+
+	def _iter_document(self) -> Iterator[str]:
+		"""Yield the cached shell around the markup of the main div's content."""
+		shell = self.shell
+		yield shell.prefix
+		if self.workers == 1:
+			for node in self.parser.div.child_nodes:
+				yield from node.iter_render(self.pretty, shell.level)
+		else:
+			from md_2_html.parallel import iter_render_parallel  # loads the process pool only when it is used
+
+			engine = 'char' if self.parser.lexer.engine == 'char' else 'fast'  # blocks are strings, not files
+			yield from iter_render_parallel(self._markdown(), self.workers, self.pretty, shell.level, engine)
+		yield shell.suffix
+
+	def _markdown(self) -> str:
+		"""Returns the markdown, as the lexer read it unless its engine doesn't read it all at once."""
+		if self.parser.lexer.file_content is None:
+			if isinstance(self.filename, str):
+				with open(self.filename, 'r', encoding='utf-8') as f:
+					self.parser.lexer.file_content = f.read()
+			else:
+				self.parser.lexer.file_content = self.filename.read()
+
+		return self.parser.lexer.file_content
+
+	def _write_document(self, stream: TextIO) -> NoReturn:
+		"""Write the document to a text stream chunk by chunk."""
+		write = stream.write
+		for chunk in self._iter_document():
+			write(chunk)
 
-		self.parser = Parser(filename)
+	def _build(self) -> NoReturn:
+		"""Gets the document shell and parses the markdown into its main div, only once."""
+		if self._built:
+			return
 
-	@staticmethod
-	def _generate_css() -> Tuple[VoidHtmlTag, VoidHtmlTag]:
-		"""Generates CSS styling for the generated .html file."""
-		bootstrap = "https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta3/dist/css/bootstrap.min.css"
-		css_bootstrap = VoidHtmlTag('link', attributes={'rel': 'stylesheet', 'href': bootstrap})
-		styles = "https://raw.githubusercontent.com/berkerdemoglu/md-2-html/master/assets/styles.css"
-		css_styles = VoidHtmlTag('link', attributes={'rel': 'stylesheet', 'href': styles})
+		stats = self.stats
+		if stats is None:
+			self.shell = document_shell(self.pretty, self.css, self.stylesheet, self.bootstrap)
+			if self.workers == 1:  # else the workers parse blocks of the file while it is rendered
+				self.parser.parse()
+		else:
+			stats.conversions += 1
+			if isinstance(self.filename, str):
+				stats.bytes_in += os.path.getsize(self.filename)
 
-		return css_bootstrap, css_styles
+			with stats.stage('document'):
+				self.shell = document_shell(self.pretty, self.css, self.stylesheet, self.bootstrap)
+			if self.workers == 1:
+				self.parser.tokens = stats.count_tokens(self.parser.tokens)
+				with stats.stage('parse', exclude='lex'):
+					self.parser.parse()
+				stats.count_nodes(self.parser.div)
 
-	def _generate_head(self) -> NoReturn:
-		"""Generates the head tag."""
-		head = HtmlTag('head')
-		# Add meta tags.
-		head.add(VoidHtmlTag('meta', attributes={'content': 'text/html', 'charset': 'utf-8'}))
-		head.add(VoidHtmlTag('meta', attributes={'name': 'author', 'content': 'MD2HTML'}))
-		head.add(
-			VoidHtmlTag('meta', attributes={'name': 'viewport', 'content': 'width=device-width, initial-scale=1.0'}))
-		# Add CSS and title.
-		style_tags = self._generate_css()
-		head.add(style_tags[0])
-		head.add(style_tags[1])
+		self._built = True
 
-		self.parser.html.add(head)
+	def render(self) -> str:
+		"""Parses markdown and returns the HTML document as a string."""
+		self._build()
+		if self.stats is None:
+			return ''.join(self._iter_document())
 
-	def _generate_body(self) -> NoReturn:
-		"""Creates body and the main div."""
-		body = HtmlTag('body')
-		body.add(self.parser.div)
+		with self.stats.stage('render'):
+			html = ''.join(self._iter_document())
+		self.stats.bytes_out += len(html.encode('utf-8'))
 
-		self.parser.html.add(body)
+		return html
 
 	def convert(self) -> NoReturn:
 		"""Parses markdown and outputs in the form of an .html file."""
-		self._generate_head()
-		self._generate_body()
-		self.parser.parse()
-		with open(self.html_filename, 'w') as f:
-			f.write(str(self.parser.html))
+		if self.html_filename is None:
+			raise ValueError("An html_filename is needed to convert a stream.")
+
+		if self.css == 'shared' and self.stylesheet is None:
+			self.stylesheet = write_stylesheet(os.path.dirname(self.html_filename), self.bootstrap).name
+
+		self._build()
+		with open(self.html_filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+			if self.stats is None:
+				self._write_document(f)
+			else:
+				with self.stats.stage('render', exclude='write'):
+					self._write_document(self.stats.timed_stream(f))
+
+		if self.stats is not None:
+			self.stats.bytes_out += os.path.getsize(self.html_filename)
 
 	# Context Manager Magic Methods
 	def __enter__(self):
@@ -66,4 +151,30 @@ class MD2HTMLConverter():
 
 	def __exit__(self, exc_type, exc_val, exc_tb):
 		if self.open_browser:
-			webbrowser.open(resources_path.as_uri() + '/document.html')
+			self.open_in_browser()
+
+	def open_in_browser(self) -> NoReturn:
+		"""Open the converted file in the web browser."""
+		import webbrowser  # only needed here, so in-memory conversions don't pay for importing it
+
+		webbrowser.open(Path(self.html_filename).resolve().as_uri())
+
+
+def convert_string(md: str, engine: str = 'fast', pretty: bool = True, stats: 'ConversionStats' = None,
+		**options) -> str:
+	"""Convert markdown text to an HTML document without touching the filesystem.
+
+	The other options (css, stylesheet, bootstrap, workers, anchors) are those of MD2HTMLConverter, css='shared' needs
+	the stylesheet.
+	"""
+	if stats is not None:
+		stats.bytes_in += len(md.encode('utf-8'))
+
+	converter = MD2HTMLConverter(io.StringIO(md), open_browser=False, engine=engine, pretty=pretty, stats=stats,
+		**options)
+	return converter.render()
+
+
+def convert_bytes(md: bytes, encoding: str = 'utf-8', **options) -> bytes:
+	"""Convert encoded markdown to an HTML document in UTF-8 like its meta charset says, see convert_string."""
+	return convert_string(md.decode(encoding), **options).encode('utf-8')
@@ -1,12 +1,17 @@
+import itertools
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from tkinter import *
 from tkinter import filedialog
 from tkinter import messagebox
+from tkinter import ttk
 
 from md_2_html.converter import MD2HTMLConverter
 from md_2_html import assets_path
 
+from typing import Tuple
+
 __all__ = [
 	"GUIApp"
 ]
@@ -14,6 +19,8 @@ __all__ = [
 FONT = ('Segoe UI', 13)
 BG_COLOR = "#282c34"
 FG_COLOR = "#abb2bf"
+POLL_INTERVAL = 100  # ms between checks whether a conversion has finished
+TEMP_NUMBERS = itertools.count()  # a cancelled conversion may still write its temporary file, so each has its own
 
 
 class GUIApp():
@@ -52,6 +59,15 @@ class GUIApp():
 		self.convert_button = Button(self.converter_frame, text='Convert', padx=5, pady=5, state='disabled',
 			command=self.convert_cmd, font=FONT, bg=BG_COLOR, fg=FG_COLOR)
 
+		# Make a progress bar and a cancel button for conversions running in the background.
+		self.progress_bar = ttk.Progressbar(self.converter_frame, mode='indeterminate', length=200)
+		self.cancel_button = Button(self.converter_frame, text='Cancel', padx=5, pady=5, state='disabled',
+			command=self.cancel_cmd, font=FONT, bg=BG_COLOR, fg=FG_COLOR)
+
+		# Conversions run on a worker thread so the window stays responsive.
+		self.executor = ThreadPoolExecutor(max_workers=1)
+		self.conversion = None  # the Future of the running conversion
+
 		# Make a radio button frame for options.
 		self.options_frame = LabelFrame(self.root, text='Options', padx=10, pady=10, font=FONT, bg=BG_COLOR,
 										fg=FG_COLOR)
@@ -75,6 +91,8 @@ class GUIApp():
 		self.file_button.pack(anchor='center')
 		self.selected_file_label.pack(anchor='center')
 		self.convert_button.pack(anchor='center')
+		self.progress_bar.pack(anchor='center', pady=5)
+		self.cancel_button.pack(anchor='center')
 
 		# Options frame widgets
 		self.options_frame.pack(anchor='center', padx=20, pady=20)
@@ -85,6 +103,7 @@ class GUIApp():
 		"""Draw all widgets and start the main loop."""
 		self.draw()
 		self.root.mainloop()
+		self.executor.shutdown(wait=False)
 
 	# COMMANDS
 	def choose_file_cmd(self):
@@ -101,18 +120,86 @@ class GUIApp():
 			self.convert_button['state'] = 'normal'
 
 	def convert_cmd(self):
-		"""Convert the selected Markdown file to a HTML file."""
-		open_browser = True if self.open_browser else False
+		"""Start converting the selected Markdown file to a HTML file in the background."""
+		conversion = self.executor.submit(self._convert, self.filename, self.open_browser.get())
+		self.conversion = conversion
+
+		self.convert_button['state'] = 'disabled'
+		self.file_button['state'] = 'disabled'
+		self.cancel_button['state'] = 'normal'
+		self.progress_bar.start()
+
+		self.root.after(POLL_INTERVAL, self._poll_conversion, conversion)
+
+	def cancel_cmd(self):
+		"""Cancel the running conversion, the HTML file is left as it was."""
+		self.conversion.cancel()  # only stops it if it hasn't started yet, else its file is deleted when it's done
+		self.conversion = None
+		self._finish_conversion()
+		messagebox.showinfo('Cancelled', 'The conversion has been cancelled.')
+
+	@staticmethod
+	def _convert(filename: str, open_browser: bool) -> Tuple[MD2HTMLConverter, str]:
+		"""Convert a file to a temporary file next to its HTML file, runs on the worker thread.
+
+		Returns the converter, whose html_filename is the temporary file, and the HTML file to move it to. The
+		page is streamed to disk like convert() does, the main loop only has to move or delete the file.
+		"""
+		converter = MD2HTMLConverter(filename, open_browser)
+		html_filename = converter.html_filename
+		converter.html_filename = f'{html_filename}.{next(TEMP_NUMBERS)}.tmp'
+		try:
+			converter.convert()
+		except BaseException:
+			if os.path.exists(converter.html_filename):
+				os.remove(converter.html_filename)
+			raise
+
+		return converter, html_filename
+
+	@staticmethod
+	def _discard(conversion: Future):
+		"""Delete the temporary file of a conversion that is no longer wanted."""
+		if conversion.cancelled() or conversion.exception() is not None:
+			return  # it wrote nothing, or deleted its file already
+		converter, _ = conversion.result()
 		try:
-			with MD2HTMLConverter(self.filename, open_browser) as converter:
-				print(converter.parser.html)
-		except:
+			os.remove(converter.html_filename)
+		except OSError:
+			pass
+
+	def _poll_conversion(self, conversion: Future):
+		"""Check whether a conversion has finished and inform the user if so."""
+		if not conversion.done():
+			self.root.after(POLL_INTERVAL, self._poll_conversion, conversion)
+			return
+
+		if conversion is not self.conversion:
+			self._discard(conversion)  # it has been cancelled and the user informed already
+			return
+
+		self.conversion = None
+		self._finish_conversion()
+		try:
+			converter, html_filename = conversion.result()
+			# Only the current conversion replaces the HTML file, at once so it never holds a partial page.
+			os.replace(converter.html_filename, html_filename)
+			converter.html_filename = html_filename
+		except Exception:
 			# Inform the user of an error's occurrence.
 			messagebox.showerror('Error', 'An error occurred.')
 		else:
 			# Inform the user of success
+			if converter.open_browser:
+				converter.open_in_browser()
 			messagebox.showinfo('Success', 'Successfully converted to HTML!')
 
+	def _finish_conversion(self):
+		"""Stop the progress bar and reset the buttons."""
+		self.progress_bar.stop()
+		self.cancel_button['state'] = 'disabled'
+		self.file_button['state'] = 'normal'
+
 		# Reset convert button.
 		self.selected_file_label['text'] = f'No file selected'
 		self.convert_button['state'] = 'disabled'
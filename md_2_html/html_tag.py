@@ -1,74 +1,201 @@
 from __future__ import annotations
-from html5print import HTMLBeautifier
+from functools import lru_cache
+from html import escape
 
-from typing import NoReturn
+from typing import Iterator, NoReturn, Optional, TextIO, Tuple, Union
 
+INDENT = ' ' * 4  # same width HTMLBeautifier was called with
+ATTRIBUTE_SETS = 4096  # distinct attribute sets kept interned, links and images mostly have their own
 
-class HtmlTag():
 
-	def __init__(self, tag: str, content: str = "", child_nodes: list = None, attributes: dict = None):
-		"""Initialize tag name, child tags and is void element."""
-		self.tag = tag
-		self.content = content
+class Attributes():
+	"""An immutable set of attributes, rendered once in both output styles and shared by the tags that have it."""
+	__slots__ = ('items', 'compact', 'pretty')
 
-		if not child_nodes:
-			self.child_nodes = []
+	def __init__(self, items: Tuple[Tuple[str, str], ...]):
+		"""Render the attributes in insertion order for compact output, sorted like HTMLBeautifier for pretty."""
+		self.items = items
+		self.compact = ''.join(' ' + attribute + '="' + escape(value) + '"' for attribute, value in items)
+		if list(items) == sorted(items):  # one string for both, as it is for most sets
+			self.pretty = self.compact
 		else:
-			self.child_nodes = child_nodes
+			self.pretty = ''.join(' ' + attribute + '="' + escape(value) + '"' for attribute, value in sorted(items))
 
-		if not attributes:
-			self.attributes = {}
-		else:
-			self.attributes = attributes
+	def __getitem__(self, attribute: str) -> str:
+		for name, value in self.items:
+			if name == attribute:
+				return value
 
-	def add(self, tag: HtmlTag) -> NoReturn:
-		self.child_nodes.append(tag)
+		raise KeyError(attribute)
 
-	def __str__(self):
-		return repr(self)
+	def __len__(self):
+		return len(self.items)
 
 	def __repr__(self):
-		if self.tag == 'html':
-			unformatted_html = '<!DOCTYPE html>'
-		else:
-			unformatted_html = ""
+		return f'Attributes({dict(self.items)})'
+
+
+NO_ATTRIBUTES = Attributes(())
+
+
+@lru_cache(maxsize=ATTRIBUTE_SETS)
+def _intern(items: Tuple[Tuple[str, str], ...]) -> Attributes:
+	return Attributes(items)
+
+
+def attribute_set(attributes: Union[dict, Attributes, None]) -> Attributes:
+	"""Returns the shared Attributes for a dict of attributes."""
+	if not attributes:
+		return NO_ATTRIBUTES
+	if isinstance(attributes, Attributes):
+		return attributes
 
-		unformatted_html += '<' + self.tag
-		# Add the attributes.
-		if self.attributes:
-			for attribute, value in self.attributes.items():
-				unformatted_html += ' ' + attribute + '="' + value + '"'
+	return _intern(tuple(attributes.items()))
 
-		unformatted_html += '>' + self.content
 
-		# Add children.
-		for child in self.child_nodes:
-			unformatted_html += str(child)
+class Node():
+	"""A node of the document tree, it renders itself and its children."""
+	__slots__ = ()
+	child_nodes = ()
 
-		# Close the tag.
-		unformatted_html += f'</{self.tag}>'
+	def iter_render(self, pretty: bool = True, level: int = 0) -> Iterator[str]:
+		"""Yield the markup of the tree in order, one tag at a time, indented from level if pretty is set."""
+		stack = [(self, level if pretty else None, False)]
+		while stack:
+			node, level, closing = stack.pop()
+			if closing:
+				yield node._closing(level)
+				continue
 
-		representation = HTMLBeautifier.beautify(unformatted_html, indent=4)
+			yield node._opening(level)
+			if isinstance(node, HtmlTag):
+				stack.append((node, level, True))
+				child_level = None if level is None else level + 1
+				stack.extend((child, child_level, False) for child in reversed(node.child_nodes))
 
-		return representation
+	def render(self, pretty: bool = True, level: int = 0) -> str:
+		"""Serialize the whole tree in a single pass, indented if pretty is set."""
+		return ''.join(self.iter_render(pretty, level))
 
+	def render_to(self, stream: TextIO, pretty: bool = True) -> NoReturn:
+		"""Write the markup to a text stream incrementally instead of building one string."""
+		write = stream.write
+		for chunk in self.iter_render(pretty):
+			write(chunk)
 
-class VoidHtmlTag(HtmlTag):
+	def _opening(self, level: Optional[int]) -> str:
+		raise NotImplementedError
 
-	def __init__(self, tag: str, attributes: dict = None):
-		"""Initialize tag name, child tags and is void element."""
-		super().__init__(tag, attributes=attributes)
+	def _closing(self, level: Optional[int]) -> str:
+		return ''
 
 	def __str__(self):
 		return repr(self)
 
+
+class Element(Node):
+	"""A node with a tag name and attributes."""
+	__slots__ = ('tag', 'attributes')
+
+	def __init__(self, tag: str, attributes: Union[dict, Attributes] = None):
+		self.tag = tag
+		self.attributes = attribute_set(attributes)
+
+
+class HtmlTag(Element):
+	"""A tag with text content and child nodes, the content comes before the children."""
+	__slots__ = ('content', 'child_nodes')
+
+	def __init__(self, tag: str, content: str = "", child_nodes: list = None, attributes: Union[dict, Attributes] = None):
+		"""Initialize tag name, text content, child nodes and attributes."""
+		super().__init__(tag, attributes)
+		self.content = content
+		self.child_nodes = child_nodes if child_nodes else ()  # a list once something is added
+
+	def add(self, node: Node) -> NoReturn:
+		if self.child_nodes:
+			self.child_nodes.append(node)
+		else:
+			self.child_nodes = [node]
+
+	def beautify(self) -> str:
+		"""Run HTMLBeautifier once over the compact markup of the whole tree."""
+		from html5print import HTMLBeautifier
+
+		return HTMLBeautifier.beautify(self.render(pretty=False), indent=4)
+
+	def _opening(self, level: Optional[int]) -> str:
+		"""Returns the start tag and the text content, level is None for compact output."""
+		doctype = '<!DOCTYPE html>' if self.tag == 'html' else ''
+		if level is None:
+			return doctype + '<' + self.tag + self.attributes.compact + '>' + escape(self.content, quote=False)
+
+		padding = INDENT * level
+		opening = (padding + doctype + '\n') if doctype else ''
+		opening += padding + '<' + self.tag + self.attributes.pretty + '>\n'
+
+		# Text goes on its own line, one level deeper, as HTMLBeautifier prints it.
+		content = self.content.strip()
+		if content:
+			opening += padding + INDENT + escape(content, quote=False) + '\n'
+
+		return opening
+
+	def _closing(self, level: Optional[int]) -> str:
+		"""Returns the end tag."""
+		if level is None:
+			return '</' + self.tag + '>'
+
+		return INDENT * level + '</' + self.tag + '>\n'
+
 	def __repr__(self):
-		unformatted_html = '<' + self.tag
-		# Add the attributes.
-		if self.attributes:
-			for attribute, value in self.attributes.items():
-				unformatted_html += ' ' + attribute + '="' + value + '"'
+		return self.render()
+
+
+class VoidHtmlTag(Element):
+	"""A tag without content, children or end tag, like <img> or <hr>."""
+	__slots__ = ()
+	content = ""
+
+	def _opening(self, level: Optional[int]) -> str:
+		"""Returns the void tag, HTML5 style (no slash) when indented."""
+		if level is None:
+			return '<' + self.tag + self.attributes.compact + ' />'
+
+		return INDENT * level + '<' + self.tag + self.attributes.pretty + '>\n'
+
+	def __repr__(self):
+		return self.render(pretty=False)
+
+
+class TextNode(Node):
+	"""Text between the child tags of a tag, it has no tag name, attributes or children of its own."""
+	__slots__ = ('content',)
+	tag = '#text'
+
+	def __init__(self, content: str):
+		self.content = content
+
+	def _opening(self, level: Optional[int]) -> str:
+		"""Returns the escaped text, on its own line when indented."""
+		if level is None:
+			return escape(self.content, quote=False)
+
+		content = self.content.strip()
+		return INDENT * level + escape(content, quote=False) + '\n' if content else ''
+
+	def __repr__(self):
+		return self._opening(None)
+
+
+class RawText(TextNode):
+	"""Text of a <style> or <script> tag, which is written as it is."""
+	__slots__ = ()
 
-		unformatted_html += ' />'
+	def _opening(self, level: Optional[int]) -> str:
+		"""Returns the text unescaped, on its own line when indented."""
+		if level is None:
+			return self.content
 
-		return unformatted_html
+		content = self.content.strip()
+		return INDENT * level + content + '\n' if content else ''
@@ -1 +1,2 @@
 from ._lexer import *
+from ._line_index import *
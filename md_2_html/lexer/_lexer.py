@@ -1,110 +1,374 @@
-from typing import List, Tuple, NoReturn
+import mmap
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple, NoReturn, Optional, Pattern, TextIO, Union
 
-from md_2_html.lexer._token import Token, TokenType
+from md_2_html.lexer._line_index import LineIndex
+from md_2_html.lexer._token import HEADING_TYPES, VALUELESS_TYPES, Token, TokenBuffer, TokenType
 
 __all__ = [
-    "Lexer"
+    "Lexer",
+    "BLANK_LOOKAHEAD",
 ]
 
-# Lexer
-class Position():
-    """A class that stores the current position being tokenized."""
-
-    def __init__(self, idx: int, ln: int, col: int):
-        """Initialize the character index, line and column number."""
-        self.idx = idx
-        self.ln = ln
-        self.col = col
+# Character classes the char engine dispatches on, every non-ASCII character is text.
+C_END, C_OTHER, C_TEXT, C_HEADING, C_ASTERISK, C_LINK, C_IMAGE, C_CODE, C_DASH, C_NEWLINE = range(10)
+TOKEN_START_CLASSES = {'#': C_HEADING, '*': C_ASTERISK, '[': C_LINK, '!': C_IMAGE, '`': C_CODE, '-': C_DASH,
+                       '\n': C_NEWLINE}
+BLANK_CHARS = ' \t\n'  # a blank line run is made of these
+SPACE_CHARS = ' \t\n\r\f\v'  # what a paragraph can't start with after blank lines
+# Blank lines end a paragraph, unless nothing but white space follows them.
+BLANK_LOOKAHEAD = r'(?=[ \t]*[^ \t\n\r\f\v])'
+BLANK_PATTERN = r'(?P<blank>\n(?:[ \t]*\n)+)' + BLANK_LOOKAHEAD  # as the fast engine matches them
+SPACE_BYTES = b' \t\n\r\f\v\x1c\x1d\x1e\x1f'  # the ASCII characters str.rstrip() removes
+STRIPPED_TYPES = frozenset(HEADING_TYPES[1:]) | {TokenType.T_TEXT}  # whose values are stripped
+MAX_CODE_LENGTH = 1 << 16  # longest inline code span, a ` not closed within it is skipped (bytes for mmap)
 
-    def advance(self, current_char: str) -> NoReturn:
-        """Increment the position."""
-        self.idx += 1
-        self.col += 1
 
-        if current_char != '\n':
-            self.ln += 1
-            self.col = 0
+# Lexer
+def _make_char_classes(text_chars: str) -> Dict[str, int]:
+    """Returns the class of each of the 128 ASCII characters and of the empty string at the end of the file."""
+    table = {chr(code): C_OTHER for code in range(128)}
+    table.update(dict.fromkeys(text_chars, C_TEXT))
+    table.update(TOKEN_START_CLASSES)
+    table[''] = C_END
+
+    return table
+
+
+def _compile_token_pattern(text_chars: str, streaming: bool = False, binary: bool = False) -> Pattern:
+    """Compile one regex whose alternatives match exactly what the per-character lexer consumes for each token."""
+    text_class = ''.join(re.escape(char) for char in text_chars)
+    text_class += r'\x80-\xff' if binary else r'\u0080-\U0010ffff'  # UTF-8 bytes or code points of non-ASCII text
+    pattern = (
+        r'(?P<hashes>#{1,6})(?P<heading>[^\n]*)'  # heading runs until the end of the line
+        r'|(?P<asterisk>\*)'
+        r'|\[(?P<link_text>[^\]\n]*)\]?\(?(?P<href>[^)\n]*)'  # ) is left behind and skipped
+        r'|!\[?(?P<alt_text>[^\]\n]*)\]?\(?(?P<src>[^)\n]*)[)\n]?'  # ) or the new line is consumed
+        r'|`(?P<code>[^`]{0,%d})`'
+        r'|(?P<dashes>-+)'
+        r'|(?P<text>[' + text_class + r']+)'
+    ) % MAX_CODE_LENGTH
+    if binary:
+        # Bytes are not read through universal new lines, so \r\n must end a line as well.
+        pattern = pattern.replace(r'\n', r'\r\n')
+
+    if binary:
+        pattern += r'|(?P<blank>\r?\n(?:[ \t]*\r?\n)+)' + BLANK_LOOKAHEAD
+    else:
+        pattern += '|' + BLANK_PATTERN
+    if streaming:
+        # Inline code still open at the end of a chunk, it may be closed by the next one. Past the longest
+        # span it can't be, so the ` is skipped and at most that much is carried over.
+        pattern += r'|`(?P<open_code>[^`]{0,%d})\Z' % MAX_CODE_LENGTH
+        # So may blank lines, the next chunk decides whether they end a paragraph.
+        pattern += r'|(?P<open_blank>\n(?:[ \t]*\n)*)\Z'
+
+    return re.compile(pattern.encode('ascii') if binary else pattern)
 
 
 class Lexer():
     """A class that creates tokens from a .md file."""
-    LETTERS = 'abcdefghijklmnopqrstuvxyz'
+    LETTERS = 'abcdefghijklmnopqrstuvwxyz'
     DIGITS = '0123456789'
     NON_TOKENS = "\" :/.?=\t"  # todo check again
     TEXT_CHARS = LETTERS + LETTERS.upper() + DIGITS + NON_TOKENS  # Store all non token characters in a class variable
-
-    def __init__(self, filename: str):
-        """Initialize an empty list of tokens, read the file content and position."""
+    CHAR_CLASSES = _make_char_classes(TEXT_CHARS)  # used by the char engine, characters not in it are text
+    ENGINES = ('fast', 'char', 'stream', 'mmap')
+    CHUNK_SIZE = 1 << 16  # characters read at a time by the stream engine
+
+    def __init__(self, source: Union[str, TextIO], engine: str = 'fast', chunk_size: int = CHUNK_SIZE,
+                 strip: bool = True):
+        """Initialize an empty list of tokens, read the file content and position.
+
+        The source is a file name or a text stream. The stream engine reads it in chunks of chunk_size
+        characters while tokenizing instead of reading it all here. The mmap engine needs a file name, it
+        scans the memory mapped UTF-8 file and only decodes token values.
+
+        Every engine lexes the text as if its end were stripped. With strip=False the other engines than mmap
+        lex it as it is instead, like a block cut out of a longer text is lexed inside it.
+        """
+        if engine not in Lexer.ENGINES:
+            raise ValueError(f"Unknown lexer engine '{engine}', expected one of {Lexer.ENGINES}.")
+        if engine == 'mmap' and not isinstance(source, str):
+            raise ValueError("The mmap engine needs a file name, not a stream.")
+        self.engine = engine
         self.tokens = []
 
-        with open(filename, 'r') as f:
-            self.file_content = f.read().rstrip() + "\n"  # read the file add a new line to avoid errors in lexing
-
-        # Initialize position to be tokenized and a flag for checking new line.
-        self.pos = Position(-1, 0, 1)
+        self.source = source
+        self.chunk_size = chunk_size
+        self.strip = strip
+        if engine in ('stream', 'mmap'):
+            self.file_content = None
+            return
+
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as f:
+                text = f.read()
+        else:
+            text = source.read()
+        self.file_content = (text.rstrip() if strip else text) + "\n"  # a new line at the end avoids errors in lexing
+
+        # Initialize the index of the character being tokenized and a flag for checking new line.
+        self.idx = -1
+        self.length = len(self.file_content)
         self.current_char = ""
         self.not_newline = True
 
+        # Handlers for each character class, they return the tokens they made.
+        self._handlers = (None, self._skip_char, self._lex_text, self._lex_heading, self._lex_asterisk,
+                          self._make_link, self._lex_image, self._lex_code, self._lex_hr, self._lex_newline)
+
         self.advance()  # so we get to the first letter
 
     def advance(self) -> NoReturn:
-        """Increment the position and get a new character."""
-        self.pos.advance(self.current_char)
-        self.current_char = self.file_content[self.pos.idx] if self.pos.idx < len(self.file_content) else ""
+        """Increment the index and get a new character, lines and columns are only worked out by line_index()."""
+        self.idx += 1
+        self.current_char = self.file_content[self.idx] if self.idx < self.length else ""
         self.not_newline = self.current_char != '\n'
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def token_pattern(streaming: bool = False, binary: bool = False) -> Pattern:
+        """Returns the token pattern of the fast (default), stream or mmap engine, compiled on first use."""
+        return _compile_token_pattern(Lexer.TEXT_CHARS, streaming, binary)
+
     def make_tokens(self) -> List[Token]:
         """Tokenize the file and return a list of tokens."""
+        self.tokens.extend(self.iter_tokens())
+
+        return self.tokens
+
+    def make_token_buffer(self) -> TokenBuffer:
+        """Tokenize the file into a TokenBuffer, which keeps offsets into the file content instead of Token objects."""
+        if self.file_content is None:
+            raise ValueError(f"The {self.engine} engine doesn't keep the file content a token buffer points into.")
+
+        tokens = TokenBuffer(self.file_content)
+        append = tokens.append
+        for token_type, start, end in self._match_spans(self.file_content):
+            append(token_type, start, end)
+
+        return tokens
+
+    def line_index(self) -> LineIndex:
+        """Returns a LineIndex of the file content, for the line and column of the tokens' offsets."""
+        if self.file_content is None:
+            raise ValueError(f"The {self.engine} engine doesn't keep the file content the offsets point into.")
+
+        return LineIndex(self.file_content)
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """Yield the tokens of the file one by one, as soon as each is recognized."""
+        if self.engine == 'fast':
+            return self._scan_tokens(self.file_content)
+        elif self.engine == 'stream':
+            return self._stream_tokens()
+        elif self.engine == 'mmap':
+            return self._mmap_tokens()
+
+        return self._advance_tokens()
+
+    def _advance_tokens(self) -> Iterator[Token]:
+        """Tokenize the file character by character with advance(), dispatching on the class of each character."""
+        handlers = self._handlers
+        char_classes = Lexer.CHAR_CLASSES
         while self.current_char != "":
-            # TODO: to check or not to check tab character or space?
-            if self.current_char == '#':
-                self.tokens.append(self._make_heading())
-            elif self.current_char == '*':
-                self.tokens.append(Token(TokenType.T_ASTRK))
-                self.advance()
-            elif self.current_char == '[':
-                link_text, url = self._make_link()
-                self.tokens.append(link_text)
-                self.tokens.append(url)
-            elif self.current_char == '!':
-                alt_text, image_link = self._make_image()
-                self.tokens.append(alt_text)
-                self.tokens.append(image_link)
-                self.advance()
-            elif self.current_char == '`':
-                self.tokens.append(self._make_code())
-            elif self.current_char == '-':
-                self.tokens.append(self._make_hr())
-            elif self.current_char in Lexer.TEXT_CHARS:
-                text_tok = self._make_text()
-                if text_tok.value:
-                    self.tokens.append(text_tok)
+            yield from handlers[char_classes.get(self.current_char, C_TEXT)]()
+
+    def _skip_char(self) -> Tuple[Token, ...]:
+        self.advance()
+        return ()
+
+    def _lex_text(self) -> Tuple[Token, ...]:
+        text_tok = self._make_text()
+        return (text_tok,) if text_tok.value else ()
+
+    def _lex_heading(self) -> Tuple[Token]:
+        return self._make_heading(),
+
+    def _lex_asterisk(self) -> Tuple[Token]:
+        start = self.idx
+        self.advance()
+        return Token(TokenType.T_ASTRK, None, start, start + 1),
+
+    def _lex_image(self) -> Tuple[Token, Token]:
+        tokens = self._make_image()
+        self.advance()  # skip ) character
+        return tokens
+
+    def _lex_code(self) -> Tuple[Token, ...]:
+        code_tok = self._make_code()
+        return (code_tok,) if code_tok is not None else ()
+
+    def _lex_hr(self) -> Tuple[Token]:
+        return self._make_hr(),
+
+    def _lex_newline(self) -> Tuple[Token, ...]:
+        """Skip a new line, or the blank lines starting at it as one new line token if a paragraph follows them."""
+        content = self.file_content
+        start = end = last_newline = self.idx
+        while end + 1 < self.length and content[end + 1] in BLANK_CHARS:
+            end += 1
+            if content[end] == '\n':
+                last_newline = end
+
+        if last_newline == start or end + 1 == self.length or content[end + 1] in SPACE_CHARS:
+            self.advance()
+            return ()
+
+        while self.idx <= last_newline:
+            self.advance()
+
+        return Token(TokenType.T_NEWLINE, None, start, last_newline + 1),
+
+    def _stream_tokens(self) -> Iterator[Token]:
+        """Tokenize the source chunk by chunk, only complete lines are scanned and the rest is carried over."""
+        if isinstance(self.source, str):
+            with open(self.source, 'r', encoding='utf-8') as f:
+                yield from self._stream_chunks(f)
+        else:
+            yield from self._stream_chunks(self.source)
+
+    def _stream_chunks(self, stream: TextIO) -> Iterator[Token]:
+        """Scan the chunks read from a stream, all tokens except inline code end on the line they start on.
+
+        The last line with content and the white space after it are carried over, so at the end of the
+        stream they are stripped like the fast engine strips the end of the file, unless strip is off.
+        """
+        pending = ""
+        offset = 0  # of pending in the source
+        chunk = stream.read(self.chunk_size)
+        while chunk:
+            buffer = pending + chunk
+            end = buffer.rfind('\n', 0, len(buffer.rstrip())) + 1  # up to the new line before the last content
+            self._scan_end = end
+            yield from self._scan_tokens(buffer, end, Lexer.token_pattern(streaming=True), offset=offset)
+
+            pending = buffer[self._scan_end:]
+            offset += self._scan_end
+            chunk = stream.read(self.chunk_size)
+
+        # An inline code span that is still open here is never closed, so its ` is skipped like in the fast engine.
+        yield from self._scan_tokens((pending.rstrip() if self.strip else pending) + "\n", offset=offset)
+
+    def _mmap_tokens(self) -> Iterator[Token]:
+        """Tokenize the file through a read-only memory map, so its content is never copied into a string."""
+        with open(self.source, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:  # empty files can't be mapped
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                # The end of the file is left out like the fast engine strips it, no token needs the new line
+                # it adds. Trailing non-ASCII white space is still scanned.
+                end = len(content)
+                while end and content[end - 1] in SPACE_BYTES:
+                    end -= 1
+                yield from self._scan_tokens(content, end, Lexer.token_pattern(binary=True), encoding='utf-8')
+
+    def _scan_tokens(self, content: Union[str, mmap.mmap], end: int = None, pattern: Pattern = None,
+                     encoding: str = None, offset: int = 0) -> Iterator[Token]:
+        """Tokenize content by matching whole tokens with pattern, characters no token starts with are skipped.
+
+        The pattern defaults to the one of the fast engine. If an encoding is given the content is bytes-like and
+        the values are decoded one token at a time, the offsets of the tokens are then in bytes. offset is where
+        content starts in the source.
+        """
+        text = TokenType.T_TEXT
+        for token_type, start, stop in self._match_spans(content, end, pattern):
+            # Identity first, sets of enum members hash them in Python.
+            if token_type is not text and token_type in VALUELESS_TYPES:
+                value = None
             else:
-                self.advance()
+                value = content[start:stop]
+                if encoding is not None:
+                    value = value.decode(encoding)
+                    if token_type is text or token_type in STRIPPED_TYPES:  # bytes.strip() leaves non-ASCII spaces
+                        value = value.strip()
+            yield Token(token_type, value, start + offset, stop + offset)
+
+    def _match_spans(self, content: Union[str, mmap.mmap], end: int = None,
+                     pattern: Pattern = None) -> Iterator[Tuple[TokenType, int, int]]:
+        """Yield the type, start and end in content of each token pattern matches, for Tokens and TokenBuffers alike.
+
+        Text and headings are stripped, their span is that of the stripped value. Inline code or blank lines
+        still open at end stop the scan, _scan_end is then set to where they start.
+        """
+        if pattern is None:
+            pattern = Lexer.token_pattern()
+
+        for match in pattern.finditer(content, 0, len(content) if end is None else end):
+            kind = match.lastgroup
+            if kind == 'text' or kind == 'heading':  # text is the most common token, so it is handled first
+                start, stop = match.span(kind)
+                raw = content[start:stop]
+                value = raw.strip()
+                if kind == 'heading':
+                    token_type = HEADING_TYPES[len(match.group('hashes'))]
+                elif value:
+                    token_type = TokenType.T_TEXT
+                else:
+                    continue
+                if value[:1] != raw[:1]:  # move past the leading white space
+                    start += len(raw) - len(raw.lstrip())
+                yield token_type, start, start + len(value)
+            elif kind == 'asterisk':
+                yield TokenType.T_ASTRK, match.start(), match.end()
+            elif kind == 'href':
+                yield (TokenType.T_LINKTEXT, *match.span('link_text'))
+                yield (TokenType.T_HREF, *match.span('href'))
+            elif kind == 'src':
+                yield (TokenType.T_IMG_ALTTEXT, *match.span('alt_text'))
+                yield (TokenType.T_SRC, *match.span('src'))
+            elif kind == 'code':
+                yield (TokenType.T_INLINE_CODE, *match.span('code'))
+            elif kind == 'blank':
+                yield TokenType.T_NEWLINE, match.start(), match.end()
+            elif kind == 'open_code' or kind == 'open_blank':
+                self._scan_end = match.start()  # rescan from there once more input is read
+                return
+            else:  # dashes
+                start, stop = match.span('dashes')
+                yield TokenType.T_HR if stop - start >= 3 else TokenType.T_TEXT, start, stop
+
+    @staticmethod
+    def _hr_token(dash_count: int, start: int = None) -> Token:
+        """Returns a horizontal rule token for 3 or more dashes, else a text token with the dashes."""
+        end = None if start is None else start + dash_count
+        if dash_count >= 3:
+            return Token(TokenType.T_HR, None, start, end)
 
-        return self.tokens
+        return Token(TokenType.T_TEXT, '-' * dash_count, start, end)
+
+    def _stripped_token(self, token_type: TokenType, start: int) -> Token:
+        """Returns a token of the stripped file content from start to the current character."""
+        raw = self.file_content[start:self.idx]
+        value = raw.strip()
+        start += len(raw) - len(raw.lstrip())
+
+        return Token(token_type, value, start, start + len(value))
 
     def _make_hr(self) -> Token:
         """Returns a horizontal rule token if there are 3 or more dashes and the line ends, else, returns a text token."""
-        dash_count = 0
+        start = self.idx
         while self.current_char == '-' and self.not_newline:  # while still reading dashes
-            dash_count += 1
             self.advance()
 
-        if dash_count >= 3:
-            return Token(TokenType.T_HR)
-
-    def _make_code(self) -> Token:
-        """Returns a code token, TODO: returns inline code token at the moment."""
-        code = ""  # empty string to store code
-        self.advance()  # skip ` character
-        while self.current_char != '`':  # while still reading code
-            code += self.current_char
+        return Lexer._hr_token(self.idx - start, start)
+
+    def _make_code(self) -> Optional[Token]:
+        """Returns an inline code token, or None and skips the ` if the span isn't closed within MAX_CODE_LENGTH."""
+        start = self.idx + 1  # skip ` character
+        end = self.file_content.find('`', start, start + MAX_CODE_LENGTH + 1)
+        if end == -1:
             self.advance()
+            return None
 
+        self.idx = end
         self.advance()  # skip ` character again
 
-        return Token(TokenType.T_INLINE_CODE, code)
+        return Token(TokenType.T_INLINE_CODE, self.file_content[start:end], start, end)
 
     def _make_heading(self) -> Token:
         """Returns a heading token"""
@@ -112,32 +376,36 @@ class Lexer():
         while self.current_char == '#' and hash_tag_count != 6:
             hash_tag_count += 1
             self.advance()
-        token_type = TokenType['T_H' + str(hash_tag_count)]  # determine heading tag
+        token_type = HEADING_TYPES[hash_tag_count]  # determine heading tag
 
-        heading_text = ""
+        start = self.idx
         while self.current_char and self.not_newline:  # while still parsing the same line as the heading
-            heading_text += self.current_char
             self.advance()
 
-        return Token(token_type, heading_text.strip())  # strip unnecessary spaces
+        return self._stripped_token(token_type, start)  # strip unnecessary spaces
 
     def _make_text(self) -> Token:
         """Returns a text token with the value of the token being the content of the text."""
-        text = ""  # Create an empty string to store characters
-        while self.current_char in Lexer.TEXT_CHARS:
-            text += self.current_char
+        start = self.idx
+        char_classes = Lexer.CHAR_CLASSES
+        while char_classes.get(self.current_char, C_TEXT) == C_TEXT:
+            self.advance()
+
+        return self._stripped_token(TokenType.T_TEXT, start)
+
+    def _read_until(self, token_type: TokenType, stop_char: str) -> Token:
+        """Returns a token of the characters up to stop_char or the end of the line, which is not consumed."""
+        start = self.idx
+        while self.current_char != stop_char and self.not_newline:
             self.advance()
 
-        return Token(TokenType.T_TEXT, text.strip())
+        return Token(token_type, self.file_content[start:self.idx], start, self.idx)
 
     def _make_link(self) -> Tuple[Token, Token]:
         """Returns two tokens, one consisting of the link text and one consisting of the URL."""
         # Read the link text.
-        link_text = ""
         self.advance()  # skip [ character
-        while self.current_char != ']' and self.not_newline:
-            link_text += self.current_char
-            self.advance()
+        link_text = self._read_until(TokenType.T_LINKTEXT, ']')
 
         # Skip ] and ( characters.
         if self.current_char == ']':
@@ -147,24 +415,18 @@ class Lexer():
             self.advance()
 
         # Read the URL.
-        url = ""
-        while self.current_char != ')' and self.not_newline:
-            url += self.current_char
-            self.advance()
+        url = self._read_until(TokenType.T_HREF, ')')
 
-        return Token(TokenType.T_LINKTEXT, link_text), Token(TokenType.T_HREF, url)
+        return link_text, url
 
     def _make_image(self) -> Tuple[Token, Token]:
-        # Read the link text.
-        alt_text = ""
         # Skip ! and [ characters.
         self.advance()
         if self.current_char == '[':
             self.advance()
 
-        while self.current_char != ']' and self.not_newline:
-            alt_text += self.current_char
-            self.advance()
+        # Read the alt text.
+        alt_text = self._read_until(TokenType.T_IMG_ALTTEXT, ']')
 
         # Skip ] and ( characters.
         if self.current_char == ']':
@@ -174,9 +436,6 @@ class Lexer():
             self.advance()
 
         # Read the URL.
-        image_link = ""
-        while self.current_char != ')' and self.not_newline:
-            image_link += self.current_char
-            self.advance()
+        image_link = self._read_until(TokenType.T_SRC, ')')
 
-        return Token(TokenType.T_IMG_ALTTEXT, alt_text), Token(TokenType.T_SRC, image_link)
+        return alt_text, image_link
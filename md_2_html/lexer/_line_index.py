@@ -0,0 +1,42 @@
+from array import array
+from bisect import bisect_right
+from typing import Tuple, Union
+
+__all__ = [
+    "LineIndex"
+]
+
+
+class LineIndex():
+    """Line and column numbers of offsets into a text, the new lines are only searched for on the first lookup."""
+    __slots__ = ('text', '_line_starts')
+
+    def __init__(self, text: Union[str, bytes]):
+        """Initialize the index of a text, bytes-like text gives the columns in bytes."""
+        self.text = text
+        self._line_starts = None
+
+    def line_starts(self) -> array:
+        """Returns the offset of the first character of every line, found with one find() per line."""
+        if self._line_starts is None:
+            newline = '\n' if isinstance(self.text, str) else b'\n'
+            find = self.text.find
+            starts = array('q', [0])
+            index = find(newline)
+            while index != -1:
+                starts.append(index + 1)
+                index = find(newline, index + 1)
+            self._line_starts = starts
+
+        return self._line_starts
+
+    def line_col(self, offset: int) -> Tuple[int, int]:
+        """Returns the line and column of an offset, both counted from 1."""
+        starts = self.line_starts()
+        line = bisect_right(starts, offset)
+
+        return line, offset - starts[line - 1] + 1
+
+    def __len__(self):
+        """Returns the number of lines."""
+        return len(self.line_starts())
@@ -1,4 +1,6 @@
+from array import array
 from enum import Enum
+from typing import Iterator
 
 # TOKENS
 class TokenType(Enum):
@@ -30,15 +32,62 @@ class TokenType(Enum):
     T_NEWLINE = '\n'
 
 
+HEADING_TYPES = (None, TokenType.T_H1, TokenType.T_H2, TokenType.T_H3, TokenType.T_H4, TokenType.T_H5, TokenType.T_H6)
+
+# Small integer kinds for compact token storage, KINDS[kind] is the token type and KIND_OF[token_type] the kind.
+KINDS = tuple(TokenType)
+KIND_OF = {token_type: kind for kind, token_type in enumerate(KINDS)}
+
+
+# Token types whose tokens have no value, only the offsets of the characters they were made from.
+VALUELESS_TYPES = frozenset((TokenType.T_ASTRK, TokenType.T_HR, TokenType.T_NEWLINE))
+
+
 class Token():
-    """A class that represents a markdown token."""
+    """A class that represents a markdown token, start and end are its offsets in the source."""
+    __slots__ = ('token_type', 'value', 'start', 'end')
 
-    def __init__(self, token_type: TokenType, value=None):
+    def __init__(self, token_type: TokenType, value=None, start: int = None, end: int = None):
         self.token_type = token_type
         self.value = value
+        self.start = start  # of the value, or of the characters if there is no value
+        self.end = end
 
     def __repr__(self):
         return f'token_type={self.token_type.name}, value={str(self.value)}'
 
     def __str__(self):
-        return f'({self.token_type.name})' if self.value is None else f'({self.token_type.name}:{self.value})'
\ No newline at end of file
+        return f'({self.token_type.name})' if self.value is None else f'({self.token_type.name}:{self.value})'
+
+
+class TokenBuffer():
+    """Tokens stored as parallel arrays of kinds and offsets into the source, Token objects are made on demand."""
+    __slots__ = ('source', 'kinds', 'starts', 'ends')
+
+    def __init__(self, source: str):
+        """Initialize empty arrays for the tokens of source."""
+        self.source = source
+        self.kinds = array('B')
+        self.starts = array('q')  # the value is source[start:end], for the token types that have one
+        self.ends = array('q')
+
+    def append(self, token_type: TokenType, start: int, end: int):
+        """Add a token whose value or characters are source[start:end]."""
+        self.kinds.append(KIND_OF[token_type])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> Token:
+        token_type = KINDS[self.kinds[index]]
+        start = self.starts[index]
+        end = self.ends[index]
+        value = None if token_type in VALUELESS_TYPES else self.source[start:end]
+
+        return Token(token_type, value, start, end)
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.kinds)):
+            yield self[index]
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from typing import Dict, NoReturn, Optional
+
+MANIFEST_NAME = '.md2html-manifest.json'
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def content_hash(filename: str) -> str:
+	"""Returns the hex digest of a file's bytes."""
+	digest = hashlib.blake2b(digest_size=16)
+	with open(filename, 'rb') as f:
+		for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+			digest.update(block)
+
+	return digest.hexdigest()
+
+
+def source_info(filename: str, stat: os.stat_result) -> Optional[dict]:
+	"""Returns the hash, size and mtime of a source converted since stat was taken, None if it changed since.
+
+	The file is hashed block by block after the conversion and stat'ed again, so the hash is that of the
+	converted bytes unless a save changed its size or mtime; that source is converted again by the next build.
+	"""
+	digest = content_hash(filename)
+	after = os.stat(filename)
+	if after.st_size != stat.st_size or after.st_mtime_ns != stat.st_mtime_ns:
+		return None
+
+	return {'hash': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def options_fingerprint(options: dict) -> str:
+	"""Returns a short digest of the conversion options, independent of their order."""
+	encoded = json.dumps(options, sort_keys=True).encode('utf-8')
+	return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class BuildManifest():
+	"""Remembers which source produced which output, with the content hash, version and options used."""
+
+	def __init__(self, filename: str, entries: Dict[str, dict] = None):
+		"""Initialize the manifest file name and its entries, keyed by source path relative to the source directory."""
+		self.filename = filename
+		self.entries = entries if entries is not None else {}
+
+	@classmethod
+	def load(cls, out_dir: str) -> 'BuildManifest':
+		"""Load the manifest of an output directory, a missing or unreadable one starts empty."""
+		filename = str(Path(out_dir) / MANIFEST_NAME)
+		try:
+			with open(filename, 'r', encoding='utf-8') as f:
+				entries = json.load(f)
+		except (OSError, ValueError):
+			entries = {}
+
+		return cls(filename, entries if isinstance(entries, dict) else {})
+
+	def save(self) -> NoReturn:
+		"""Write the manifest, replacing the old one only once it has been written completely."""
+		temp_filename = self.filename + '.tmp'
+		with open(temp_filename, 'w', encoding='utf-8') as f:
+			json.dump(self.entries, f, indent=1, sort_keys=True)
+		os.replace(temp_filename, self.filename)
+
+	def lookup(self, key: str, filename: str, version: str, fingerprint: str) -> Optional[str]:
+		"""Returns the content hash of an unchanged source or None if it has to be converted.
+
+		The hash is only recomputed when the file's size or modification time differ from the recorded ones.
+		"""
+		entry = self.entries.get(key)
+		stat = os.stat(filename)
+		if entry is None or entry['version'] != version or entry['options'] != fingerprint:
+			return None
+		if not os.path.exists(entry['output']):
+			return None
+		if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+			return entry['hash']
+
+		digest = content_hash(filename)
+		if digest != entry['hash']:
+			return None
+		# Touched but not changed, remember the new stat so the next build doesn't hash it again.
+		entry['mtime_ns'] = stat.st_mtime_ns
+
+		return digest
+
+	def record(self, key: str, source: dict, output: str, version: str, fingerprint: str,
+			index: Optional[dict] = None) -> NoReturn:
+		"""Remember that a source has been converted, with its anchors and links if they were collected.
+
+		source is the hash, size and mtime of the bytes that were converted, as source_info returns them.
+		"""
+		self.entries[key] = {
+			'hash': source['hash'],
+			'size': source['size'],
+			'mtime_ns': source['mtime_ns'],
+			'version': version,
+			'options': fingerprint,
+			'output': output,
+		}
+		if index is not None:
+			self.entries[key].update(index)
+
+	def forget(self, key: str) -> Optional[dict]:
+		"""Remove and return the entry of a source."""
+		return self.entries.pop(key, None)
@@ -1,19 +1,187 @@
-from md_2_html.html_tag import HtmlTag, VoidHtmlTag
+from md_2_html.anchors import is_local, rewrite_link, unique_slug
+from md_2_html.html_tag import HtmlTag, TextNode, VoidHtmlTag
 from md_2_html.lexer import Lexer
+from md_2_html.lexer._token import TokenType
+from md_2_html.shell import MAIN_ATTRIBUTES
+
+from typing import List, NoReturn, Optional, TextIO, Union
+
+HEADING_TAGS = {
+	TokenType.T_H1: 'h1',
+	TokenType.T_H2: 'h2',
+	TokenType.T_H3: 'h3',
+	TokenType.T_H4: 'h4',
+	TokenType.T_H5: 'h5',
+	TokenType.T_H6: 'h6',
+}
+SPACE = TextNode(' ')  # shared by all the tags that are next to each other
 
 
 class Parser():
 	"""Parses the tokens coming from the lexer."""
 
-	def __init__(self, filename: str):
-		"""Initialize the <html> tag and lexer."""
-		self.html = HtmlTag('html', attributes={'lang': 'en-CA', 'class': 'html'})
-		self.div = HtmlTag('div', attributes={'class': 'main container'})
+	def __init__(self, filename: Union[str, TextIO], engine: str = 'fast', anchors: bool = False, strip: bool = True):
+		"""Initialize the main div and lexer, the rest of the document is the shell around it.
+
+		With anchors, headings get slug ids, links to .md files lead to their .html files, and the slugs and
+		local links are kept in anchors and links for the anchor index. strip is passed on to the Lexer.
+		"""
+		self.div = HtmlTag('div', attributes=MAIN_ATTRIBUTES)
+		self.anchors: Optional[List[str]] = [] if anchors else None
+		self.links: Optional[List[str]] = [] if anchors else None
+		self._slugs = {}  # how many headings have each slug
+
+		# Tokens are pulled from the lexer while parsing, no token list is built.
+		self.lexer = Lexer(filename, engine, strip=strip)
+		self.tokens = self.lexer.iter_tokens()
+
+		# The open paragraph followed by the emphasis tags open in it, and the text not added to the last one yet.
+		self._open = []
+		self._text = []
+		self._asterisks = []  # where each asterisk of the run read last starts and ends in the source
+		self._end = None  # where the last inline token of the open paragraph ends, None before the first
 
-		self.lexer = Lexer(filename)
-		self.tokens = self.lexer.make_tokens()
+	def parse(self) -> NoReturn:
+		"""Build the content of the main div from the tokens in one pass, without looking back at any of them.
 
-	def parse(self):
-		# todo, not implemented yet
+		Headings, horizontal rules and blank lines end the open paragraph, the other tokens are added to it.
+		Runs of asterisks open or close emphasis once the run ends, emphasis still open at the end of a
+		paragraph is closed with it. Inline tokens are separated by a space where the source has something
+		between them, like a line break, and joined where it doesn't.
+		"""
+		label = None  # link text or alt text token, the next token is its URL
 		for token in self.tokens:
-			print(str(token))
+			token_type = token.token_type
+			if token_type is TokenType.T_ASTRK:
+				self._asterisks.append((token.start, token.end))
+				continue
+			if self._asterisks:
+				self._emphasis()
+
+			if token_type is TokenType.T_TEXT:
+				self._add_text(token.value, token.start, token.end)
+			elif token_type is TokenType.T_LINKTEXT or token_type is TokenType.T_IMG_ALTTEXT:
+				label = token
+			elif token_type is TokenType.T_HREF:
+				# The spans include the [ before the text and the ) after the URL.
+				if token.value.strip():
+					tag = HtmlTag('a', label.value, attributes={'href': self._link(token.value)})
+					self._add_inline(tag, label.start - 1, token.end + 1)
+				elif label.value:  # [text] without a URL is just text
+					self._add_text(label.value, label.start - 1, token.end)
+			elif token_type is TokenType.T_SRC:
+				if token.value.strip():
+					tag = VoidHtmlTag('img', attributes={'alt': label.value, 'src': token.value})
+					self._add_inline(tag, label.start - 2, token.end + 1)
+				elif label.value:
+					self._add_text(label.value, label.start - 2, token.end)
+			elif token_type is TokenType.T_INLINE_CODE:
+				self._add_inline(HtmlTag('code', token.value), token.start - 1, token.end + 1)
+			elif token_type is TokenType.T_NEWLINE:
+				self._close_paragraph()
+			elif token_type is TokenType.T_HR:
+				self._close_paragraph()
+				self.div.add(VoidHtmlTag('hr'))
+			elif token_type in HEADING_TAGS:
+				self._close_paragraph()
+				self.div.add(HtmlTag(HEADING_TAGS[token_type], token.value, attributes=self._anchor(token.value)))
+
+		if self._asterisks:
+			self._emphasis()
+		self._close_paragraph()
+
+	def _link(self, href: str) -> str:
+		"""Returns the href a link is written with, local ones are remembered with anchors."""
+		if self.links is None:
+			return href
+		if is_local(href):
+			self.links.append(href)
+
+		return rewrite_link(href)
+
+	def _anchor(self, heading: str) -> Optional[dict]:
+		"""Returns the attributes of a heading, with anchors its id."""
+		if self.anchors is None:
+			return None
+		slug = unique_slug(heading, self._slugs)
+		self.anchors.append(slug)
+
+		return {'id': slug}
+
+	def _parent(self) -> HtmlTag:
+		"""Returns the innermost open tag, a new paragraph is opened if there is none."""
+		if not self._open:
+			paragraph = HtmlTag('p')
+			self.div.add(paragraph)
+			self._open.append(paragraph)
+
+		return self._open[-1]
+
+	def _space_before(self, start: int) -> NoReturn:
+		"""Add a space to the innermost open tag if the source has anything between the last token and start."""
+		if self._end is None or start <= self._end:
+			return
+		if self._text:
+			self._text.append(' ')
+		elif self._open[-1].child_nodes:
+			self._open[-1].add(SPACE)
+
+	def _add_text(self, text: str, start: int, end: int) -> NoReturn:
+		"""Add text to the innermost open tag, consecutive text is joined into one text node."""
+		if not self._open:
+			self._parent()
+		elif self._text and start > self._end:  # the common case of _space_before, inlined
+			self._text.append(' ')
+		else:
+			self._space_before(start)
+		self._text.append(text)
+		self._end = end
+
+	def _flush_text(self) -> NoReturn:
+		"""Add the text read so far to the innermost open tag as one text node."""
+		self._open[-1].add(TextNode(''.join(self._text)))
+		self._text = []
+
+	def _add_inline(self, tag: HtmlTag, start: int, end: int) -> NoReturn:
+		"""Add a tag to the innermost open tag after the text read so far."""
+		parent = self._parent()
+		self._space_before(start)
+		if self._text:
+			self._flush_text()
+		parent.add(tag)
+		self._end = end
+
+	def _emphasis(self) -> NoReturn:
+		"""Close or open emphasis for the run of asterisks, ** is strong and * is em."""
+		run = self._asterisks
+		self._asterisks = []
+		used = 0
+		while used < len(run):
+			count = len(run) - used
+			innermost = self._open[-1].tag if len(self._open) > 1 else None
+			if innermost == 'strong' and count >= 2:
+				self._close_inline(run[used + 1][1])
+				used += 2
+			elif innermost == 'em' and count % 2:
+				self._close_inline(run[used][1])
+				used += 1
+			else:
+				size = 2 if count >= 2 else 1
+				tag = HtmlTag('strong' if size == 2 else 'em')
+				self._add_inline(tag, run[used][0], run[used + size - 1][1])
+				self._open.append(tag)
+				used += size
+
+	def _close_inline(self, end: int) -> NoReturn:
+		"""Close the innermost emphasis tag with the asterisks ending at end."""
+		if self._text:
+			self._flush_text()
+		self._open.pop()
+		self._end = end
+
+	def _close_paragraph(self) -> NoReturn:
+		"""Close the open paragraph and everything open in it."""
+		if self._text:
+			self._flush_text()
+		self._open.clear()
+		self._end = None
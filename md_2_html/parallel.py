@@ -0,0 +1,35 @@
+"""Convert one large markdown text on several cores, by rendering blocks of it in worker processes."""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from md_2_html.blocks import iter_blocks, render_block
+
+from typing import Iterator, Optional, Tuple
+
+DEFAULT_BLOCK_SIZE = 1 << 20  # characters of markdown a worker renders at a time
+PENDING_PER_WORKER = 2  # blocks handed out ahead per worker, bounds the memory held by results not written yet
+
+
+def _render(job: Tuple[str, bool, Optional[int], str]) -> str:
+	"""Render one (block, pretty, level, engine) job."""
+	return render_block(*job)
+
+
+def iter_render_parallel(md: str, workers: int = None, pretty: bool = True, level: Optional[int] = 0,
+		engine: str = 'fast', block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[str]:
+	"""Yield the markup of md's nodes in order, rendered a block at a time across a pool of worker processes.
+
+	The markup is the same as that of parsing md in one piece and rendering it at level. workers defaults to
+	the number of CPUs. Blocks are cut at the first safe place after block_size characters, see iter_blocks.
+	"""
+	workers = workers or os.cpu_count() or 1
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		pending = deque()
+		for block in iter_blocks(md, block_size):
+			pending.append(executor.submit(_render, (block, pretty, level, engine)))
+			if len(pending) >= workers * PENDING_PER_WORKER:
+				yield pending.popleft().result()
+
+		while pending:
+			yield pending.popleft().result()
@@ -0,0 +1,92 @@
+"""The document around the converted markdown, rendered once per option set and reused by every conversion."""
+from functools import lru_cache
+
+from md_2_html.html_tag import Element, HtmlTag, RawText, TextNode, VoidHtmlTag
+from md_2_html.stylesheet import BOOTSTRAP_URL, CACHED_STYLESHEETS, STYLES_URL, bootstrap_signature
+from md_2_html.stylesheet import stylesheet as minified_stylesheet
+
+from typing import NamedTuple, Optional, Tuple
+
+HTML_ATTRIBUTES = {'lang': 'en-CA', 'class': 'html'}
+MAIN_ATTRIBUTES = {'class': 'main container'}
+CONTENT_LEVEL = 3  # indentation of the main div's children: html, body, div
+_CONTENT_MARKER = '\0'  # stands in for the content while the shell is rendered
+
+
+class DocumentShell(NamedTuple):
+	"""The markup before and after the content of the main div, and the level the content is indented at."""
+	prefix: str
+	suffix: str
+	level: Optional[int]
+
+
+def generate_css(css: str = 'cdn', stylesheet: Optional[str] = None,
+		bootstrap: Optional[str] = None) -> Tuple[Element, ...]:
+	"""Generates CSS styling for the generated .html file.
+
+	With css='cdn' it links Bootstrap and the styles online. 'inline' puts the minified packaged styles in a
+	<style> tag and 'shared' links them at the stylesheet href, neither needs the network. They include a
+	local Bootstrap file if one is given, and no Bootstrap otherwise.
+	"""
+	if css == 'inline':
+		style = HtmlTag('style')
+		style.add(RawText(minified_stylesheet(bootstrap)))
+		return style,
+	elif css == 'shared':
+		if stylesheet is None:
+			raise ValueError("The shared css mode needs the href of the stylesheet.")
+		return VoidHtmlTag('link', attributes={'rel': 'stylesheet', 'href': stylesheet}),
+
+	css_bootstrap = VoidHtmlTag('link', attributes={'rel': 'stylesheet', 'href': BOOTSTRAP_URL})
+	css_styles = VoidHtmlTag('link', attributes={'rel': 'stylesheet', 'href': STYLES_URL})
+
+	return css_bootstrap, css_styles
+
+
+def generate_head(**css_options) -> HtmlTag:
+	"""Generates the head tag."""
+	head = HtmlTag('head')
+	# Add meta tags.
+	head.add(VoidHtmlTag('meta', attributes={'content': 'text/html', 'charset': 'utf-8'}))
+	head.add(VoidHtmlTag('meta', attributes={'name': 'author', 'content': 'MD2HTML'}))
+	head.add(VoidHtmlTag('meta', attributes={'name': 'viewport', 'content': 'width=device-width, initial-scale=1.0'}))
+	# Add CSS.
+	for style_tag in generate_css(**css_options):
+		head.add(style_tag)
+
+	return head
+
+
+def generate_document(main: HtmlTag, **css_options) -> HtmlTag:
+	"""Generates the html tag with the head, and the body holding the main div, see generate_css for the options."""
+	html = HtmlTag('html', attributes=HTML_ATTRIBUTES)
+	html.add(generate_head(**css_options))
+	body = HtmlTag('body')
+	body.add(main)
+	html.add(body)
+
+	return html
+
+
+def document_shell(pretty: bool = True, css: str = 'cdn', stylesheet: Optional[str] = None,
+		bootstrap: Optional[str] = None) -> DocumentShell:
+	"""Render the document once for these options, split where the content of the main div goes.
+
+	It is rendered again once the local Bootstrap file changes, if it is inlined.
+	"""
+	signature = bootstrap_signature(bootstrap) if css == 'inline' else None  # only inline css reads the file
+
+	return _document_shell(pretty, css, stylesheet, bootstrap, signature)
+
+
+@lru_cache(maxsize=CACHED_STYLESHEETS * 8)
+def _document_shell(pretty: bool, css: str, stylesheet: Optional[str], bootstrap: Optional[str],
+		signature: Optional[Tuple[int, int]]) -> DocumentShell:
+	level = CONTENT_LEVEL if pretty else None
+	marker = TextNode(_CONTENT_MARKER)
+	main = HtmlTag('div', attributes=MAIN_ATTRIBUTES)
+	main.add(marker)
+	document = generate_document(main, css=css, stylesheet=stylesheet, bootstrap=bootstrap)
+	prefix, suffix = document.render(pretty).split(marker.render(pretty, level))
+
+	return DocumentShell(prefix, suffix, level)
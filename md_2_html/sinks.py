@@ -0,0 +1,106 @@
+"""Where the pages of a build are written: a directory, memory, or a single tar or zip archive."""
+import io
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+
+from typing import Dict, NoReturn
+
+ARCHIVE_BUFFER_SIZE = 1 << 20  # archives are written to disk in 1 MiB blocks
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tgz', '.tar.gz', '.tar.bz2', '.tar.xz')
+TAR_SUFFIXES = {'.tar': '', '.tgz': 'gz', '.gz': 'gz', '.bz2': 'bz2', '.xz': 'xz'}  # compression per suffix
+
+
+class OutputSink():
+	"""Receives the encoded pages of a build by their POSIX path relative to the site root."""
+
+	def write(self, name: str, data: bytes) -> NoReturn:
+		"""Write one page, or any other file of the site."""
+		raise NotImplementedError
+
+	def close(self) -> NoReturn:
+		"""Finish writing, nothing can be written afterwards."""
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.close()
+
+
+class DirectorySink(OutputSink):
+	"""Writes each page to its own file under a directory."""
+
+	def __init__(self, directory: str):
+		self.directory = Path(directory)
+
+	def write(self, name: str, data: bytes) -> NoReturn:
+		path = self.directory / name
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_bytes(data)
+
+
+class MemorySink(OutputSink):
+	"""Keeps the pages in a dict, for serving them or testing."""
+
+	def __init__(self):
+		self.pages: Dict[str, bytes] = {}
+
+	def write(self, name: str, data: bytes) -> NoReturn:
+		self.pages[name] = data
+
+
+class TarSink(OutputSink):
+	"""Appends the pages to a tar stream, compressed as its suffix says (.tar, .tar.gz/.tgz, .tar.bz2, .tar.xz)."""
+
+	def __init__(self, filename: str):
+		self.filename = filename
+		compression = TAR_SUFFIXES.get(Path(filename).suffix, '')
+		# tarfile only ever appends to the file, the buffer turns that into large sequential writes.
+		self.file = open(filename, 'wb', buffering=ARCHIVE_BUFFER_SIZE)
+		self.archive = tarfile.open(fileobj=self.file, mode=f'w:{compression}')
+
+	def write(self, name: str, data: bytes) -> NoReturn:
+		info = tarfile.TarInfo(name)
+		info.size = len(data)
+		info.mtime = int(time.time())
+		info.mode = 0o644
+		self.archive.addfile(info, io.BytesIO(data))
+
+	def close(self) -> NoReturn:
+		self.archive.close()
+		self.file.close()
+
+
+class ZipSink(OutputSink):
+	"""Appends the pages to a deflated zip file, through a large write buffer."""
+
+	def __init__(self, filename: str):
+		self.filename = filename
+		self.file = open(filename, 'wb', buffering=ARCHIVE_BUFFER_SIZE)
+		self.archive = zipfile.ZipFile(self.file, 'w', compression=zipfile.ZIP_DEFLATED)
+
+	def write(self, name: str, data: bytes) -> NoReturn:
+		self.archive.writestr(name, data)
+
+	def close(self) -> NoReturn:
+		self.archive.close()
+		self.file.close()
+
+
+def is_archive(target: str) -> bool:
+	"""Returns whether a build target names an archive rather than a directory."""
+	return target.endswith(ARCHIVE_SUFFIXES)
+
+
+def open_sink(target: str) -> OutputSink:
+	"""Returns the sink for a build target: a zip or tar archive by its suffix, a directory otherwise."""
+	if not is_archive(target):
+		return DirectorySink(target)
+
+	Path(target).parent.mkdir(parents=True, exist_ok=True)
+	if target.endswith('.zip'):
+		return ZipSink(target)
+
+	return TarSink(target)
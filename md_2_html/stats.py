@@ -0,0 +1,109 @@
+from md_2_html.html_tag import HtmlTag
+from md_2_html.lexer._token import Token
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+import json
+import time
+
+from typing import Iterator, NoReturn, TextIO, Union
+
+
+class ConversionStats():
+	"""Wall time per stage, bytes in and out, tokens by type and nodes by tag of one or more conversions.
+
+	The stages are lex, parse, document (head and body), render and write. Lexing runs while parsing pulls
+	tokens, so its time is measured per token and left out of the parse time; the same goes for writing
+	while rendering.
+	"""
+
+	def __init__(self):
+		"""Initialize all counters to zero."""
+		self.conversions = 0
+		self.seconds = defaultdict(float)  # stage -> seconds
+		self.bytes_in = 0
+		self.bytes_out = 0
+		self.tokens = Counter()  # token type name -> count
+		self.nodes = Counter()  # tag -> count
+
+	@contextmanager
+	def stage(self, name: str, exclude: str = None):
+		"""Add the time spent in the with block to a stage, minus what another stage gained meanwhile."""
+		excluded = self.seconds[exclude] if exclude else 0.0
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			elapsed = time.perf_counter() - start
+			if exclude:
+				elapsed -= self.seconds[exclude] - excluded
+			self.seconds[name] += elapsed
+
+	def count_tokens(self, tokens: Iterator[Token]) -> Iterator[Token]:
+		"""Wrap a token iterator, counting the tokens by type and the time spent making them as the lex stage."""
+		clock = time.perf_counter
+		counts = self.tokens
+		tokens = iter(tokens)
+		while True:
+			start = clock()
+			token = next(tokens, None)
+			self.seconds['lex'] += clock() - start
+			if token is None:
+				return
+
+			counts[token.token_type.name] += 1
+			yield token
+
+	def count_nodes(self, html: HtmlTag) -> NoReturn:
+		"""Count the tags of a tree."""
+		stack = [html]
+		while stack:
+			tag = stack.pop()
+			self.nodes[tag.tag] += 1
+			stack.extend(tag.child_nodes)
+
+	def timed_stream(self, stream: TextIO) -> '_TimedStream':
+		"""Wrap a text stream so the time spent in its write method counts as the write stage."""
+		return _TimedStream(stream, self)
+
+	def merge(self, other: Union['ConversionStats', dict]) -> NoReturn:
+		"""Add the counters of other stats, or of their to_dict(), to these."""
+		if isinstance(other, ConversionStats):
+			other = other.to_dict()
+
+		self.conversions += other['conversions']
+		for stage, seconds in other['seconds'].items():
+			self.seconds[stage] += seconds
+		self.bytes_in += other['bytes_in']
+		self.bytes_out += other['bytes_out']
+		self.tokens.update(other['tokens'])
+		self.nodes.update(other['nodes'])
+
+	def to_dict(self) -> dict:
+		"""Returns the counters as plain, JSON serializable types."""
+		return {
+			'conversions': self.conversions,
+			'seconds': dict(self.seconds),
+			'bytes_in': self.bytes_in,
+			'bytes_out': self.bytes_out,
+			'tokens': dict(self.tokens),
+			'nodes': dict(self.nodes),
+		}
+
+	def to_json(self, **kwargs) -> str:
+		"""Returns the counters as JSON, kwargs go to json.dumps."""
+		return json.dumps(self.to_dict(), sort_keys=True, **kwargs)
+
+
+class _TimedStream():
+	"""A text stream wrapper that adds the time spent writing to the write stage of some stats."""
+
+	def __init__(self, stream: TextIO, stats: ConversionStats):
+		self.stream = stream
+		self.stats = stats
+
+	def write(self, text: str) -> int:
+		start = time.perf_counter()
+		written = self.stream.write(text)
+		self.stats.seconds['write'] += time.perf_counter() - start
+
+		return written
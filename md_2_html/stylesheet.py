@@ -0,0 +1,68 @@
+"""The packaged stylesheet, minified to be inlined in each page or written once as a content-hashed file pages share."""
+import hashlib
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from md_2_html import assets_path
+
+from typing import Optional, Tuple
+
+CSS_MODES = ('cdn', 'inline', 'shared')
+BOOTSTRAP_URL = "https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta3/dist/css/bootstrap.min.css"
+STYLES_URL = "https://raw.githubusercontent.com/berkerdemoglu/md-2-html/master/assets/styles.css"
+CACHED_STYLESHEETS = 16  # versions of the stylesheet kept, a new one is made whenever the Bootstrap file changes
+
+
+def minify_css(css: str) -> str:
+	"""Drop comments and the white space around punctuation, strings in the CSS must not rely on white space."""
+	css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+	css = re.sub(r'\s+', ' ', css)
+	css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+	css = re.sub(r':\s+', ':', css)
+
+	return css.replace(';}', '}').strip()
+
+
+def bootstrap_signature(bootstrap: Optional[str]) -> Optional[Tuple[int, int]]:
+	"""Returns the mtime and size of the local Bootstrap file, part of the cache keys so edits to it are seen."""
+	if bootstrap is None:
+		return None
+	stat = os.stat(bootstrap)
+
+	return stat.st_mtime_ns, stat.st_size
+
+
+def stylesheet(bootstrap: Optional[str] = None) -> str:
+	"""Returns the minified packaged styles, after the local Bootstrap file if one is given."""
+	return _stylesheet(bootstrap, bootstrap_signature(bootstrap))
+
+
+@lru_cache(maxsize=CACHED_STYLESHEETS)
+def _stylesheet(bootstrap: Optional[str], signature: Optional[Tuple[int, int]]) -> str:
+	css = (assets_path / 'styles.css').read_text(encoding='utf-8')
+	if bootstrap is not None:
+		css = Path(bootstrap).read_text(encoding='utf-8') + '\n' + css
+
+	return minify_css(css)
+
+
+def stylesheet_name(bootstrap: Optional[str] = None) -> str:
+	"""Returns the file name of the shared stylesheet, which changes whenever its content does."""
+	digest = hashlib.blake2b(stylesheet(bootstrap).encode('utf-8'), digest_size=8).hexdigest()
+
+	return f'md2html.{digest}.css'
+
+
+def write_stylesheet(directory: str, bootstrap: Optional[str] = None) -> Path:
+	"""Write the shared stylesheet into directory unless it is there already, returns its path."""
+	path = Path(directory) / stylesheet_name(bootstrap)
+	if not path.exists():  # the name is the content's hash, so an existing file is up to date
+		path.parent.mkdir(parents=True, exist_ok=True)
+		tmp = path.with_name(f'{path.name}.{os.getpid()}-{threading.get_ident()}.tmp')  # one per writer
+		tmp.write_text(stylesheet(bootstrap), encoding='utf-8')
+		os.replace(tmp, path)
+
+	return path
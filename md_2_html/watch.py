@@ -0,0 +1,120 @@
+"""Watch markdown files and convert them again when they change, re-rendering only the blocks that changed."""
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+
+from md_2_html.blocks import render_block, split_blocks
+from md_2_html.shell import document_shell
+from md_2_html.stylesheet import bootstrap_signature, write_stylesheet
+
+from typing import Callable, Dict, List, NoReturn, Optional, Tuple
+
+DEFAULT_INTERVAL = 0.5  # seconds between two checks of the files
+
+
+def block_hash(block: str) -> bytes:
+	"""Returns the digest a rendered block is cached under."""
+	return hashlib.blake2b(block.encode('utf-8'), digest_size=16).digest()
+
+
+class LiveDocument():
+	"""The HTML of a markdown text that changes over time, blocks are only rendered when they are new."""
+
+	def __init__(self, pretty: bool = True, engine: str = 'fast', **css_options):
+		"""Initialize an empty block cache, the css options are those of MD2HTMLConverter."""
+		self.pretty = pretty
+		self.engine = engine
+		self.css_options = css_options
+		self.blocks: Dict[bytes, str] = {}  # rendered markup per block hash, only for the blocks of the last text
+
+	def update(self, md: str) -> Tuple[str, int]:
+		"""Returns the HTML document of md and how many of its blocks had to be rendered."""
+		shell = document_shell(self.pretty, **self.css_options)  # cached, but made again if Bootstrap changed
+		blocks = {}
+		parts = [shell.prefix]
+		rendered = 0
+		for block in split_blocks(md):
+			key = block_hash(block)
+			markup = blocks.get(key)
+			if markup is None:
+				markup = self.blocks.get(key)
+			if markup is None:
+				markup = render_block(block, self.pretty, shell.level, self.engine)
+				rendered += 1
+			blocks[key] = markup
+			parts.append(markup)
+		parts.append(shell.suffix)
+
+		self.blocks = blocks  # blocks that are gone are dropped
+
+		return ''.join(parts), rendered
+
+
+class Watcher():
+	"""Converts markdown files whenever their size or modification time, or those of the Bootstrap file, change."""
+
+	def __init__(self, filenames: List[str], **options):
+		"""Initialize a live document per file, the options are those of LiveDocument.
+
+		With css='shared' and no stylesheet href, the stylesheet is written next to each file like convert() does,
+		again under its new name whenever the local Bootstrap file changes.
+		"""
+		self.documents = {filename: LiveDocument(**options) for filename in filenames}
+		self.write_stylesheets = options.get('css') == 'shared' and options.get('stylesheet') is None
+		self.signatures: Dict[str, Optional[tuple]] = dict.fromkeys(filenames)
+
+	@staticmethod
+	def html_filename(filename: str) -> str:
+		"""Returns where the HTML of a file is written, next to it like MD2HTMLConverter does."""
+		return str(Path(filename).with_suffix('.html'))
+
+	def poll(self) -> List[Tuple[str, int]]:
+		"""Convert the files that changed since the last poll, returns each one with the number of blocks rendered.
+
+		A file that can't be read or written is reported on stderr and left out, the others are still converted.
+		"""
+		converted = []
+		for filename, document in self.documents.items():
+			try:
+				rendered = self._convert(filename, document)
+			except (OSError, UnicodeDecodeError) as e:  # keep watching, the next save may fix it
+				print(f'{filename}: {type(e).__name__}: {e}', file=sys.stderr)
+				continue
+			if rendered is not None:
+				converted.append((filename, rendered))
+
+		return converted
+
+	def _convert(self, filename: str, document: LiveDocument) -> Optional[int]:
+		"""Convert a file if it changed, returns the number of blocks rendered or None if it didn't change."""
+		try:
+			stat = os.stat(filename)
+		except FileNotFoundError:  # it may be in the middle of being saved
+			return None
+
+		# A change to the local Bootstrap file converts the file again as well.
+		signature = (stat.st_mtime_ns, stat.st_size, bootstrap_signature(document.css_options.get('bootstrap')))
+		if signature == self.signatures[filename]:
+			return None
+		self.signatures[filename] = signature
+
+		if self.write_stylesheets:
+			stylesheet = write_stylesheet(str(Path(filename).parent), document.css_options.get('bootstrap'))
+			document.css_options['stylesheet'] = stylesheet.name
+		with open(filename, 'r', encoding='utf-8') as f:
+			html, rendered = document.update(f.read())
+		with open(self.html_filename(filename), 'w', encoding='utf-8') as f:
+			f.write(html)
+
+		return rendered
+
+	def watch(self, interval: float = DEFAULT_INTERVAL, on_convert: Callable[[str, int], object] = None) -> NoReturn:
+		"""Poll the files every interval seconds until interrupted, on_convert is called for each conversion."""
+		while True:
+			converted = self.poll()
+			if on_convert is not None:
+				for filename, rendered in converted:
+					on_convert(filename, rendered)
+			time.sleep(interval)
@@ -0,0 +1,50 @@
+import io
+
+from md_2_html import batch, cli
+from md_2_html.anchors import AnchorIndex, rewrite_link, unique_slug
+from md_2_html.md_parser import Parser
+
+
+def test_slugs_and_links():
+	seen = {}
+	assert [unique_slug(text, seen) for text in ('Hello, World!', 'hello world', 'Hello World')] == \
+		['hello-world', 'hello-world-1', 'hello-world-2']
+	assert rewrite_link('../other.md#setup') == '../other.html#setup'
+	assert rewrite_link('https://example.com/readme.md') == 'https://example.com/readme.md'
+
+
+def test_parser_collects_anchors():
+	parser = Parser(io.StringIO('# Intro\n[next](next.md#usage) [web](https://example.com)\n## Intro\n'), anchors=True)
+	parser.parse()
+
+	assert parser.anchors == ['intro', 'intro-1']
+	assert parser.links == ['next.md#usage']
+	assert ''.join(node.render(False) for node in parser.div.child_nodes) == (
+		'<h1 id="intro">Intro</h1><p><a href="next.html#usage">next</a> <a href="https://example.com">web</a></p>'
+		'<h2 id="intro-1">Intro</h2>')
+
+
+def test_index_reports_dead_links():
+	index = AnchorIndex()
+	index.add('index.md', ['top'], ['guide/intro.md#setup', 'guide/intro.md#gone', 'missing.md', '#top', 'logo.png'])
+	index.add('guide/intro.md', ['setup'], ['../index.html#top'])
+
+	assert [(dead.href, dead.reason) for dead in index.dead_links()] == \
+		[('guide/intro.md#gone', 'no such anchor'), ('missing.md', 'no such document')]
+
+
+def test_incremental_build_keeps_the_index(tmp_path, capsys):
+	src, out = tmp_path / 'src', tmp_path / 'out'
+	(src / 'guide').mkdir(parents=True)
+	(src / 'index.md').write_text('# Home\n[intro](guide/intro.md#setup)\n')
+	(src / 'guide' / 'intro.md').write_text('## Setup\n[home](../index.md#home)\n')
+	cli.main(['build', str(src), str(out), '--workers', '1', '--anchors'])
+	assert 'dead link' not in capsys.readouterr().err
+	assert 'href="guide/intro.html#setup"' in (out / 'index.html').read_text()
+
+	(src / 'guide' / 'intro.md').write_text('## Install\n')
+	results = batch.build(str(src), str(out), workers=1, anchors=True)
+
+	assert [result.status for result in results].count(batch.UNCHANGED) == 1
+	dead = batch.link_index(str(out), results).dead_links()
+	assert [(link.source, link.href) for link in dead] == [('index.md', 'guide/intro.md#setup')]
@@ -0,0 +1,32 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from md_2_html import convert_string
+from md_2_html.async_converter import convert_async, convert_many_async, convert_string_async
+
+
+def test_convert_async(tmp_path):
+	filename = tmp_path / 'page.md'
+	filename.write_text('# Title\n')
+
+	html_filename = asyncio.run(convert_async(str(filename)))
+
+	assert html_filename == str(tmp_path / 'page.html')
+	assert (tmp_path / 'page.html').read_text(encoding='utf-8') == convert_string('# Title\n')
+
+
+def test_convert_string_async():
+	assert asyncio.run(convert_string_async('# Title\n', pretty=False)) == convert_string('# Title\n', pretty=False)
+
+
+def test_convert_many_async_in_processes(tmp_path):
+	filenames = []
+	for i in range(5):
+		filename = tmp_path / f'page{i}.md'
+		filename.write_text(f'# Page {i}\n')
+		filenames.append(str(filename))
+
+	with ProcessPoolExecutor(max_workers=2) as executor:
+		html_filenames = asyncio.run(convert_many_async(filenames, limit=2, executor=executor))
+
+	assert html_filenames == [filename.replace('.md', '.html') for filename in filenames]
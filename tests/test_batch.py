@@ -0,0 +1,127 @@
+import pytest
+
+from md_2_html import batch, cli
+from md_2_html.sinks import MemorySink
+
+
+def _make_tree(root):
+	(root / 'guide').mkdir(parents=True)
+	(root / 'index.md').write_text('# Index\n')
+	(root / 'guide' / 'intro.md').write_text('## Intro\n[link](other.md)\n')
+	(root / 'broken.md').write_bytes(b'# \x81 undecodable\n')
+
+
+def test_build_reports_failures_per_file(tmp_path):
+	_make_tree(tmp_path / 'src')
+
+	results = batch.build(str(tmp_path / 'src'), str(tmp_path / 'out'), workers=2, chunksize=1)
+
+	errors = {result.source.replace(str(tmp_path / 'src'), ''): result.error for result in results}
+	assert errors['/index.md'] is None
+	assert errors['/guide/intro.md'] is None
+	assert errors['/broken.md'].startswith('UnicodeDecodeError')
+	assert (tmp_path / 'out' / 'guide' / 'intro.html').exists()
+
+
+def test_build_command(tmp_path, capsys):
+	_make_tree(tmp_path / 'src')
+
+	status = cli.main(['build', str(tmp_path / 'src'), str(tmp_path / 'out'), '--workers', '1'])
+
+	assert status == 1
+	assert 'Converted 2 of 3 files, 0 unchanged, 0 removed.' in capsys.readouterr().out
+	assert (tmp_path / 'out' / 'index.html').exists()
+
+
+def test_incremental_build(tmp_path):
+	src, out = tmp_path / 'src', tmp_path / 'out'
+	_make_tree(src)
+	batch.build(str(src), str(out), workers=1)
+
+	(src / 'guide' / 'intro.md').write_text('## Changed\n')
+	(src / 'index.md').unlink()
+	(src / 'new.md').write_text('new\n')
+	results = batch.build(str(src), str(out), workers=1)
+
+	statuses = {result.source.replace(str(src), ''): result.status for result in results}
+	assert statuses == {
+		'/guide/intro.md': batch.CONVERTED,
+		'/new.md': batch.CONVERTED,
+		'/broken.md': batch.FAILED,
+		'/index.md': batch.PRUNED,
+	}
+	assert not (out / 'index.html').exists()
+
+	results = batch.build(str(src), str(out), workers=1)
+	assert [result.status for result in results].count(batch.UNCHANGED) == 2
+
+
+def test_build_shares_one_stylesheet(tmp_path):
+	src, out = tmp_path / 'src', tmp_path / 'out'
+	_make_tree(src)
+	(src / 'broken.md').unlink()
+
+	batch.build(str(src), str(out), workers=1, css='shared')
+
+	stylesheets = list(out.glob('md2html.*.css'))
+	assert len(stylesheets) == 1
+	name = stylesheets[0].name
+	assert f'href="{name}"' in (out / 'index.html').read_text()
+	assert f'href="../{name}"' in (out / 'guide' / 'intro.html').read_text()
+	assert 'https://' not in (out / 'index.html').read_text()
+
+
+def test_build_into_archive(tmp_path, capsys):
+	import tarfile
+	import zipfile
+
+	src = tmp_path / 'src'
+	_make_tree(src)
+
+	status = cli.main(['build', str(src), str(tmp_path / 'site.zip'), '--workers', '2', '--css', 'shared'])
+
+	assert status == 1
+	assert 'Converted 2 of 3 files' in capsys.readouterr().out
+	with zipfile.ZipFile(tmp_path / 'site.zip') as archive:
+		names = archive.namelist()
+		assert sorted(name for name in names if name.endswith('.html')) == ['guide/intro.html', 'index.html']
+		stylesheet = next(name for name in names if name.endswith('.css'))
+		assert f'href="../{stylesheet}"' in archive.read('guide/intro.html').decode('utf-8')
+
+	batch.build(str(src), str(tmp_path / 'site.tar.gz'), workers=1)
+	with tarfile.open(tmp_path / 'site.tar.gz') as archive:
+		assert sorted(archive.getnames()) == ['guide/intro.html', 'index.html']
+	assert not (tmp_path / '.md2html-manifest.json').exists()
+
+
+def test_build_to_memory_matches_directory(tmp_path):
+	src, out = tmp_path / 'src', tmp_path / 'out'
+	_make_tree(src)
+	batch.build(str(src), str(out), workers=1)
+
+	sink = MemorySink()
+	batch.build_to_sink(str(src), sink, workers=1)
+
+	assert sink.pages == {name: (out / name).read_bytes() for name in ('index.html', 'guide/intro.html')}
+
+
+@pytest.mark.parametrize('engine', ['fast', 'stream', 'mmap'])
+def test_file_saved_during_build_is_converted_again(tmp_path, monkeypatch, engine):
+	src, out = tmp_path / 'src', tmp_path / 'out'
+	_make_tree(src)
+	convert = batch.MD2HTMLConverter.convert
+
+	def convert_then_save(converter):
+		convert(converter)
+		if converter.html_filename.endswith('index.html'):
+			(src / 'index.md').write_text('# Saved meanwhile\n')
+
+	monkeypatch.setattr(batch.MD2HTMLConverter, 'convert', convert_then_save)
+	batch.build(str(src), str(out), workers=1, engine=engine)
+	monkeypatch.undo()
+
+	assert 'Index' in (out / 'index.html').read_text()
+	results = batch.build(str(src), str(out), workers=1, engine=engine)
+	statuses = {result.source.replace(str(src), ''): result.status for result in results}
+	assert statuses['/index.md'] == batch.CONVERTED
+	assert 'Saved meanwhile' in (out / 'index.html').read_text()
@@ -0,0 +1,19 @@
+from benchmarks import corpus, suite
+
+
+def test_corpus_is_deterministic():
+	for kind in corpus.KINDS:
+		md = corpus.generate(kind, 4096, seed=1)
+
+		assert len(md) >= 4096
+		assert md == corpus.generate(kind, 4096, seed=1)
+
+
+def test_suite_and_baseline_comparison():
+	results = suite.run_suite({'tiny': 2048}, ['mixed'], repeat=1)
+
+	assert set(results) == {f'mixed/tiny/{stage}' for stage in suite.STAGES}
+	assert suite.compare(results, results) == []
+
+	faster = {name: {'mb_per_s': result['mb_per_s'] * 2} for name, result in results.items()}
+	assert len(suite.compare(results, faster)) == len(suite.STAGES)
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from md_2_html import RenderCache, convert_string
+
+
+def test_render_hits_after_first_miss():
+	cache = RenderCache()
+
+	first = cache.render('# Title\n', pretty=False)
+	second = cache.render('# Title\n', pretty=False)
+
+	assert first is second
+	assert first == convert_string('# Title\n', pretty=False)
+	assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_options_are_part_of_the_key():
+	assert RenderCache.make_key('x', pretty=True, engine='fast') == RenderCache.make_key('x', engine='fast', pretty=True)
+	assert RenderCache.make_key('x', pretty=True) != RenderCache.make_key('x', pretty=False)
+
+
+def test_least_recently_used_is_evicted():
+	cache = RenderCache(max_entries=2)
+	cache.put(b'a', 'A')
+	cache.put(b'b', 'B')
+	cache.get(b'a')
+	cache.put(b'c', 'C')
+
+	assert cache.get(b'b') is None
+	assert cache.get(b'a') == 'A'
+	assert cache.stats()['evictions'] == 1
+
+
+def test_size_bound():
+	cache = RenderCache(max_bytes=200)
+	cache.put(b'big', 'x' * 500)
+	cache.put(b'a', 'x' * 100)
+	cache.put(b'b', 'x' * 100)
+
+	assert cache.get(b'big') is None
+	assert len(cache) == 1
+	assert cache.stats()['bytes'] <= 200
+
+
+def test_shared_between_threads():
+	cache = RenderCache(max_entries=8)
+	documents = [f'# Page {i % 16}\n' for i in range(200)]
+
+	with ThreadPoolExecutor(max_workers=8) as executor:
+		results = list(executor.map(lambda md: cache.render(md), documents))
+
+	assert results[0] == convert_string(documents[0])
+	assert len(cache) <= 8
+	assert cache.stats()['hits'] + cache.stats()['misses'] == 200
+
+
+def test_stats_only_count_misses():
+	from md_2_html.stats import ConversionStats
+
+	cache = RenderCache()
+	miss, hit = ConversionStats(), ConversionStats()
+	first = cache.render('# Title\n', stats=miss, pretty=False)
+	second = cache.render('# Title\n', stats=hit, pretty=False)
+
+	assert first is second
+	assert miss.conversions == 1 and hit.conversions == 0
@@ -0,0 +1,72 @@
+import md_2_html
+from md_2_html.converter import MD2HTMLConverter
+from md_2_html.shell import document_shell
+
+
+def test_convert_string_matches_file_conversion(tmp_path):
+	filename = tmp_path / 'page.md'
+	filename.write_text('# Title\nSome text\n')
+	MD2HTMLConverter(str(filename), open_browser=False).convert()
+
+	html = md_2_html.convert_string('# Title\nSome text\n')
+
+	assert html == (tmp_path / 'page.html').read_text(encoding='utf-8')
+	assert html.startswith('<!DOCTYPE html>\n<html class="html" lang="en-CA">\n')
+
+
+def test_convert_bytes():
+	html = md_2_html.convert_bytes('# Überschrift\n'.encode('utf-8'), pretty=False)
+
+	assert html.startswith(b'<!DOCTYPE html><html lang="en-CA" class="html">')
+	assert html.endswith(b'</html>')
+
+
+def test_convert_bytes_writes_utf_8_whatever_the_input_encoding():
+	html = md_2_html.convert_bytes('# Überschrift\n'.encode('latin-1'), encoding='latin-1', pretty=False)
+
+	assert '<h1>Überschrift</h1>'.encode('utf-8') in html
+	assert b'charset="utf-8"' in html
+
+
+def test_document_shell_is_rendered_once_per_options():
+	shell = document_shell(pretty=False)
+
+	assert document_shell(pretty=False) is shell
+	assert shell.prefix.endswith('<div class="main container">') and shell.suffix == '</div></body></html>'
+
+	html = md_2_html.convert_string('# Title', pretty=False)
+	assert html == shell.prefix + '<h1>Title</h1>' + shell.suffix
+	assert md_2_html.convert_string('').count('<div class="main container">') == 1
+
+
+def test_inline_css_needs_no_network(tmp_path):
+	bootstrap = tmp_path / 'bootstrap.css'
+	bootstrap.write_text('/* local */\nbody > p {\n    color: red;\n}\n')
+
+	html = md_2_html.convert_string('# Title', css='inline', bootstrap=str(bootstrap))
+
+	assert '<style>' in html and 'https://' not in html
+	assert 'body>p{color:red}.main{' in html
+
+
+def test_shared_css_is_written_next_to_the_page(tmp_path):
+	filename = tmp_path / 'page.md'
+	filename.write_text('# Title\n')
+	MD2HTMLConverter(str(filename), open_browser=False, css='shared').convert()
+
+	stylesheet, = tmp_path.glob('md2html.*.css')
+	assert f'<link href="{stylesheet.name}" rel="stylesheet">' in (tmp_path / 'page.html').read_text()
+
+
+def test_edits_to_the_bootstrap_file_are_seen(tmp_path):
+	from md_2_html.stylesheet import stylesheet_name
+
+	bootstrap = tmp_path / 'bootstrap.css'
+	bootstrap.write_text('p {color: red}')
+	first = md_2_html.convert_string('# Title', css='inline', bootstrap=str(bootstrap))
+	name = stylesheet_name(str(bootstrap))
+
+	bootstrap.write_text('p {color: blue}')
+	assert 'p{color:blue}' in md_2_html.convert_string('# Title', css='inline', bootstrap=str(bootstrap))
+	assert 'p{color:red}' in first
+	assert stylesheet_name(str(bootstrap)) != name
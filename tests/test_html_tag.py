@@ -0,0 +1,69 @@
+import io
+
+from md_2_html.html_tag import HtmlTag, TextNode, VoidHtmlTag
+
+
+def _document():
+	html = HtmlTag('html', attributes={'lang': 'en-CA'})
+	head = HtmlTag('head')
+	head.add(VoidHtmlTag('meta', attributes={'content': 'text/html', 'charset': 'utf-8'}))
+	html.add(head)
+	body = HtmlTag('body')
+	div = HtmlTag('div', attributes={'class': 'main'})
+	div.add(HtmlTag('h1', 'Credens & co'))
+	body.add(div)
+	html.add(body)
+
+	return html
+
+
+def test_pretty_render():
+	assert str(_document()) == (
+		'<!DOCTYPE html>\n'
+		'<html lang="en-CA">\n'
+		'    <head>\n'
+		'        <meta charset="utf-8" content="text/html">\n'
+		'    </head>\n'
+		'    <body>\n'
+		'        <div class="main">\n'
+		'            <h1>\n'
+		'                Credens &amp; co\n'
+		'            </h1>\n'
+		'        </div>\n'
+		'    </body>\n'
+		'</html>\n'
+	)
+
+
+def test_compact_render():
+	assert _document().render(pretty=False) == (
+		'<!DOCTYPE html><html lang="en-CA"><head><meta content="text/html" charset="utf-8" /></head>'
+		'<body><div class="main"><h1>Credens &amp; co</h1></div></body></html>'
+	)
+
+
+def test_render_to_stream():
+	stream = io.StringIO()
+	_document().render_to(stream)
+
+	assert stream.getvalue() == _document().render()
+	assert ''.join(_document().iter_render(pretty=False)) == _document().render(pretty=False)
+
+
+def test_attribute_sets_are_shared():
+	first = HtmlTag('div', attributes={'class': 'main', 'id': 'a'})
+	second = VoidHtmlTag('hr', attributes={'class': 'main', 'id': 'a'})
+
+	assert first.attributes is second.attributes
+	assert first.attributes['id'] == 'a'
+	assert HtmlTag('p').attributes is VoidHtmlTag('br').attributes
+	assert not hasattr(first, '__dict__') and not hasattr(TextNode('x'), '__dict__')
+
+
+def test_text_nodes():
+	paragraph = HtmlTag('p')
+	paragraph.add(TextNode('a < b '))
+	paragraph.add(HtmlTag('em', 'c'))
+
+	assert paragraph.render(pretty=False) == '<p>a &lt; b <em>c</em></p>'
+	assert paragraph.render() == '<p>\n    a &lt; b\n    <em>\n        c\n    </em>\n</p>\n'
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = 100  # for importing md_2_html and everything a first convert_string call needs
+HEAVY_MODULES = ('importlib.metadata', 'html5print', 'webbrowser', 'asyncio', 'tkinter', 'concurrent.futures')
+
+
+def _import_times(code):
+	"""Returns the cumulative import time in microseconds of each top-level import made by running code."""
+	stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+		check=True, capture_output=True, text=True).stderr
+
+	times = {}
+	for line in stderr.splitlines():
+		if not line.startswith('import time:') or 'cumulative' in line:
+			continue
+		_, cumulative, name = line.split('|')
+		times[name.rstrip()] = int(cumulative)
+
+	return times
+
+
+def test_convert_string_import_budget():
+	times = _import_times("import md_2_html; md_2_html.convert_string('# Title')")
+
+	imported = {name.strip() for name in times}
+	assert not imported.intersection(HEAVY_MODULES)
+
+	top_level = sum(cumulative for name, cumulative in times.items() if not name.startswith(' '))
+	assert top_level / 1000 < IMPORT_BUDGET_MS
@@ -0,0 +1,195 @@
+import io
+import pytest
+
+from md_2_html import resources_path
+from md_2_html.lexer import LineIndex, Lexer
+
+SAMPLE = """# Title with trailing spaces   
+####### seven hashes
+Some text: "quoted" / path.md?x=1 with, punctuation!
+*emphasis* and **strong**
+[link](http://example.com) [no url] [unclosed
+![alt](img.png)![](b.png) !bang
+`inline code` and `code spanning
+two lines`
+-- --- ----
+
+a paragraph after a blank line
+  	
+	 after white space only lines
+
+
+"""
+
+
+def _token_strings(filename, engine):
+	return [str(token) for token in Lexer(filename, engine=engine).make_tokens()]
+
+
+@pytest.mark.parametrize('name', ['document.md', 'document2.md'])
+def test_fast_engine_matches_char_engine_on_resources(name):
+	filename = str(resources_path / name)
+
+	assert _token_strings(filename, 'fast') == _token_strings(filename, 'char')
+
+
+def test_fast_engine_matches_char_engine_on_sample(tmp_path):
+	filename = tmp_path / 'sample.md'
+	filename.write_text(SAMPLE)
+
+	assert _token_strings(str(filename), 'fast') == _token_strings(str(filename), 'char')
+
+
+def test_unknown_engine(tmp_path):
+	filename = tmp_path / 'sample.md'
+	filename.write_text(SAMPLE)
+
+	with pytest.raises(ValueError):
+		Lexer(str(filename), engine='slow')
+
+
+@pytest.mark.parametrize('engine', Lexer.ENGINES)
+def test_iter_tokens_is_lazy(tmp_path, engine):
+	filename = tmp_path / 'sample.md'
+	filename.write_text(SAMPLE)
+	lexer = Lexer(str(filename), engine=engine)
+
+	tokens = lexer.iter_tokens()
+	first = next(tokens)
+
+	assert str(first) == '(T_H1:Title with trailing spaces)'
+	assert not lexer.tokens
+	assert [str(first)] + [str(token) for token in tokens] == _token_strings(str(filename), engine)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, Lexer.CHUNK_SIZE])
+@pytest.mark.parametrize('end', ['', '[a](b   ', '[a](b   \n  \n', '# trailing  \n\n'])
+def test_stream_engine_matches_fast_engine(chunk_size, end):
+	content = (resources_path / 'document2.md').read_text() + SAMPLE + end
+	streamed = Lexer(io.StringIO(content), engine='stream', chunk_size=chunk_size).make_tokens()
+
+	assert [str(token) for token in streamed] == [str(token) for token in Lexer(io.StringIO(content)).make_tokens()]
+
+
+def test_unclosed_code_is_given_up_after_the_longest_span():
+	content = 'stray ` here\n' + 'word *and* [link](x)\n\n' * 20000 + '`late` code\n'
+	streamed = Lexer(io.StringIO(content), engine='stream', chunk_size=4096).make_tokens()
+
+	assert [str(token) for token in streamed] == [str(token) for token in Lexer(io.StringIO(content)).make_tokens()]
+	assert _token_strings(io.StringIO(content), 'char') == [str(token) for token in streamed]
+	assert str(streamed[-2]) == '(T_INLINE_CODE:late)'
+
+
+def test_stream_engine_reads_files(tmp_path):
+	filename = tmp_path / 'sample.md'
+	filename.write_text(SAMPLE + 'unterminated `code')
+
+	assert _token_strings(str(filename), 'stream') == _token_strings(str(filename), 'fast')
+	assert _token_strings(str(filename), 'char') == _token_strings(str(filename), 'fast')
+
+
+@pytest.mark.parametrize('end', ['', '[docs](guide.md   \n', '[docs](guide.md \r\n\t\r\n', '#   \n\n', '![a](b  '])
+def test_mmap_engine_matches_fast_engine(tmp_path, end):
+	filename = tmp_path / 'sample.md'
+	content = (resources_path / 'document2.md').read_text() + SAMPLE + '## Überschrift ünïcödé\n' + end
+	filename.write_bytes(content.encode('utf-8'))
+
+	assert _token_strings(str(filename), 'mmap') == _token_strings(str(filename), 'fast')
+
+
+def test_mmap_offsets_at_the_end_of_the_file(tmp_path):
+	filename = tmp_path / 'end.md'
+	filename.write_text('text\n\n#   \n  \n', encoding='utf-8')
+
+	assert _token_spans(Lexer(str(filename), engine='mmap').make_tokens()) == \
+		_token_spans(Lexer(str(filename)).make_tokens())
+
+
+def test_mmap_engine_empty_file(tmp_path):
+	filename = tmp_path / 'empty.md'
+	filename.write_text('')
+
+	assert Lexer(str(filename), engine='mmap').make_tokens() == []
+
+
+def test_token_buffer_matches_tokens(tmp_path):
+	filename = tmp_path / 'sample.md'
+	filename.write_text((resources_path / 'document2.md').read_text() + SAMPLE)
+	tokens = Lexer(str(filename)).make_token_buffer()
+
+	assert len(tokens) == len(_token_strings(str(filename), 'fast'))
+	assert [str(token) for token in tokens] == _token_strings(str(filename), 'fast')
+
+
+@pytest.mark.parametrize('engine', Lexer.ENGINES)
+def test_w_and_non_ascii_are_text(tmp_path, engine):
+	filename = tmp_path / 'text.md'
+	filename.write_text('wow, Grüße — 日本語\n', encoding='utf-8')
+
+	assert _token_strings(str(filename), engine) == ['(T_TEXT:wow)', '(T_TEXT:Grüße — 日本語)']
+
+
+def test_mmap_engine_reads_crlf_blank_lines(tmp_path):
+	filename = tmp_path / 'crlf.md'
+	filename.write_bytes(b'# Title\r\n\r\ntext\r\n \t\r\n\r\n![alt](a.png)\r\n\r\nend\r\n\r\n')
+
+	assert _token_strings(str(filename), 'mmap') == _token_strings(str(filename), 'fast')
+	assert '(T_NEWLINE)' in _token_strings(str(filename), 'fast')
+
+
+def _token_spans(tokens):
+	return [(str(token), token.start, token.end) for token in tokens]
+
+
+def test_token_offsets_match_across_engines(tmp_path):
+	content = (resources_path / 'document2.md').read_text() + SAMPLE
+	filename = tmp_path / 'sample.md'
+	filename.write_text(content, encoding='utf-8')
+	lexer = Lexer(str(filename))
+	spans = _token_spans(lexer.make_tokens())
+
+	assert spans == _token_spans(Lexer(str(filename), engine='char').make_tokens())
+	assert spans == _token_spans(Lexer(io.StringIO(content), engine='stream', chunk_size=7).make_tokens())
+	assert spans == _token_spans(lexer.make_token_buffer())
+	for token in lexer.tokens:
+		if token.value is not None:
+			assert lexer.file_content[token.start:token.end] == token.value
+
+
+def test_mmap_offsets_are_in_bytes(tmp_path):
+	filename = tmp_path / 'text.md'
+	filename.write_text('# Grüße\n\n*wow*\n', encoding='utf-8')
+	tokens = Lexer(str(filename), engine='mmap').make_tokens()
+
+	assert _token_spans(tokens) == [('(T_H1:Grüße)', 2, 9), ('(T_NEWLINE)', 9, 11), ('(T_ASTRK)', 11, 12),
+		('(T_TEXT:wow)', 12, 15), ('(T_ASTRK)', 15, 16)]
+
+
+def test_line_index():
+	lexer = Lexer(io.StringIO('# Title\n\nsome *text*\n  [link](x.md)'))
+	index = lexer.line_index()
+
+	assert [(str(token), index.line_col(token.start)) for token in lexer.make_tokens()][-3:] == [
+		('(T_ASTRK)', (3, 11)), ('(T_LINKTEXT:link)', (4, 4)), ('(T_HREF:x.md)', (4, 10))]
+	assert len(index) == 5
+	assert LineIndex(b'a\nb').line_col(2) == (2, 1)
+
+
+def test_engines_read_utf8_whatever_the_locale(tmp_path):
+	import os
+	import subprocess
+	import sys
+
+	filename = tmp_path / 'accents.md'
+	filename.write_text('# Café\nnaïve [lien](été.md)\n', encoding='utf-8')
+	code = (
+		"import sys; from md_2_html.lexer import Lexer; "
+		"tokens = [[str(t) for t in Lexer(sys.argv[1], engine=e).make_tokens()] for e in Lexer.ENGINES]; "
+		"assert all(t == tokens[0] for t in tokens), tokens; print(tokens[0][0])"
+	)
+	env = dict(os.environ, LC_ALL='C', PYTHONCOERCECLOCALE='0', PYTHONUTF8='0', PYTHONIOENCODING='utf-8')
+	result = subprocess.run([sys.executable, '-c', code, str(filename)], env=env, capture_output=True, text=True,
+		encoding='utf-8')
+
+	assert result.returncode == 0, result.stderr
+	assert result.stdout.strip() == '(T_H1:Café)'
@@ -0,0 +1,47 @@
+import io
+
+from md_2_html.md_parser import Parser
+
+
+def _body(md):
+	parser = Parser(io.StringIO(md))
+	parser.parse()
+
+	return ''.join(child.render(pretty=False) for child in parser.div.child_nodes)
+
+
+def test_blocks():
+	assert _body('# Title\nfirst line\nsecond line\n\nnext paragraph\n---\n## Sub') == (
+		'<h1>Title</h1><p>first line second line</p><p>next paragraph</p><hr /><h2>Sub</h2>'
+	)
+
+
+def test_inline():
+	assert _body('Some *emph* **strong** and ***both*** [link](a.html) `x < y` ![alt](i.png)') == (
+		'<p>Some <em>emph</em> <strong>strong</strong> and <strong><em>both</em></strong> '
+		'<a href="a.html">link</a> <code>x &lt; y</code> <img alt="alt" src="i.png" /></p>'
+	)
+
+
+def test_nested_emphasis():
+	assert _body('*a **b** c*\n**a *b* c**') == (
+		'<p><em>a <strong>b</strong> c</em> <strong>a <em>b</em> c</strong></p>'
+	)
+
+
+def test_unclosed_emphasis_ends_with_the_paragraph():
+	assert _body('*open\n\nnext') == '<p><em>open</em></p><p>next</p>'
+
+
+def test_links_without_url_are_text():
+	assert _body('[no url]\n![no src]\nnext') == '<p>no url no src next</p>'
+
+
+def test_blank_urls_are_not_links():
+	assert _body('Read the [manual]  \n\n[]  \n\n![logo]  ') == '<p>Read the manual</p><p>logo</p>'
+
+
+def test_spaces_follow_the_source():
+	assert _body('a well-known *em*. [link](a.html), `code`s') == (
+		'<p>a well-known <em>em</em>. <a href="a.html">link</a> <code>code</code>s</p>'
+	)
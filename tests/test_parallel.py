@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from md_2_html import convert_string, resources_path
+from md_2_html.blocks import split_blocks
+from md_2_html.parallel import iter_render_parallel
+from md_2_html.shell import CONTENT_LEVEL, document_shell
+
+MD = ((resources_path / 'document2.md').read_text() + '\n\n`code across\n\nblocks`\n# Heading right after\n') * 3
+FRAGMENTS = ['word', ' ', '  ', '\n', '\n\n', '\n \n', '[a](b', ')', '![i](s', '`', '*', '**', '# h', '\n#', '-', 'é']
+
+
+def test_blocks_are_cut_after_min_size():
+	blocks = split_blocks(MD, min_size=500)
+
+	assert all(len(block) >= 500 for block in blocks[:-1])
+	assert len(blocks) < len(split_blocks(MD))
+
+
+@pytest.mark.parametrize('pretty', [True, False])
+def test_parallel_rendering_matches_serial(pretty):
+	level = CONTENT_LEVEL if pretty else None
+	body = ''.join(iter_render_parallel(MD, workers=2, pretty=pretty, level=level, block_size=300))
+
+	assert convert_string(MD, pretty=pretty).count(body) == 1
+	assert convert_string(MD, pretty=pretty, workers=2) == convert_string(MD, pretty=pretty)
+
+
+@pytest.mark.parametrize('pretty', [True, False])
+def test_parallel_rendering_of_random_texts(pretty):
+	rng = random.Random(1)  # seeded so a failure can be reproduced
+	texts = [''.join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(1, 200))) for _ in range(20)]
+	shell = document_shell(pretty)
+	for md in ['Read the [manual]  \n\n' * 50 + 'end'] + texts:
+		body = ''.join(iter_render_parallel(md, workers=2, pretty=pretty, level=shell.level, block_size=20))
+		assert shell.prefix + body + shell.suffix == convert_string(md, pretty=pretty), repr(md)
@@ -0,0 +1,47 @@
+import json
+
+from md_2_html import cli, convert_string
+from md_2_html.converter import MD2HTMLConverter
+from md_2_html.stats import ConversionStats
+
+MD = '# Title\n[link](x.md) *a* `b`\n'
+
+
+def test_convert_string_stats():
+	stats = ConversionStats()
+	html = convert_string(MD, stats=stats)
+
+	result = json.loads(stats.to_json())
+	assert result['conversions'] == 1
+	assert result['bytes_in'] == len(MD)
+	assert result['bytes_out'] == len(html)
+	assert result['tokens'] == {'T_H1': 1, 'T_LINKTEXT': 1, 'T_HREF': 1, 'T_ASTRK': 2, 'T_TEXT': 1, 'T_INLINE_CODE': 1}
+	assert result['nodes']['div'] == 1 and result['nodes']['h1'] == 1
+	assert set(result['seconds']) == {'document', 'lex', 'parse', 'render'}
+
+
+def test_file_conversion_stats_merge(tmp_path):
+	filename = tmp_path / 'page.md'
+	filename.write_text(MD)
+	total = ConversionStats()
+	for _ in range(2):
+		stats = ConversionStats()
+		MD2HTMLConverter(str(filename), open_browser=False, stats=stats).convert()
+		total.merge(stats)
+
+	assert total.conversions == 2
+	assert total.bytes_in == 2 * len(MD)
+	assert total.bytes_out == 2 * (tmp_path / 'page.html').stat().st_size
+	assert total.tokens['T_ASTRK'] == 4
+	assert total.seconds['write'] > 0
+
+
+def test_build_command_writes_stats(tmp_path):
+	(tmp_path / 'src').mkdir()
+	(tmp_path / 'src' / 'a.md').write_text(MD)
+
+	cli.main(['build', str(tmp_path / 'src'), str(tmp_path / 'out'), '-j', '1', '--stats', str(tmp_path / 'stats.json')])
+
+	stats = json.loads((tmp_path / 'stats.json').read_text())
+	assert stats['total']['conversions'] == 1
+	assert list(stats['files']) == [str(tmp_path / 'src' / 'a.md')]
@@ -0,0 +1,78 @@
+import os
+import random
+
+import pytest
+
+from md_2_html import convert_string, resources_path
+from md_2_html.blocks import split_blocks
+from md_2_html.watch import LiveDocument, Watcher
+
+MD = (resources_path / 'document2.md').read_text() + """
+*emphasis left open
+
+`inline code
+
+across a blank line` and ![image](without a closing paren
+
+trailing text
+"""
+FRAGMENTS = ['word', 'two words', ' ', '  ', '\t', '\n', '\n\n', '\n  \n', '[a](b', ')', '[x]', '![i](s', '![', '`', '*',
+	'**', '# h', '\n#', '---', '-', '.', 'é']
+
+
+def random_texts(count, seed=0):
+	"""Returns count texts made of random fragments, seeded so a failure can be reproduced."""
+	rng = random.Random(seed)
+	return [''.join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(1, 30))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('pretty', [True, False])
+def test_blocks_render_like_the_whole_text(pretty):
+	html, rendered = LiveDocument(pretty=pretty).update(MD)
+
+	assert html == convert_string(MD, pretty=pretty)
+	assert rendered == len(set(split_blocks(MD)))
+	assert any('`inline code\n\nacross a blank line`' in block for block in split_blocks(MD))
+
+
+@pytest.mark.parametrize('pretty', [True, False])
+def test_random_texts_render_like_the_whole_text(pretty):
+	for md in ['Read the [manual]  \n\nnext', '![logo](x  \n\n\nnext', '`a  \n\n# b`'] + random_texts(500):
+		assert LiveDocument(pretty=pretty).update(md)[0] == convert_string(md, pretty=pretty), repr(md)
+
+
+def test_only_changed_blocks_are_rendered():
+	document = LiveDocument()
+	document.update(MD)
+
+	changed = MD.replace('## Emphasis', '## Emphasis changed')
+	html, rendered = document.update(changed)
+
+	assert rendered == 1
+	assert html == convert_string(changed)
+
+
+def test_watcher_converts_changed_files(tmp_path):
+	filename = tmp_path / 'page.md'
+	filename.write_text('# Title\n\nfirst\n')
+	watcher = Watcher([str(filename)])
+
+	assert watcher.poll() == [(str(filename), 2)]
+	assert watcher.poll() == []
+
+	filename.write_text('# Title\n\nsecond\n')
+	os.utime(filename, ns=(0, 0))  # a new modification time even if the clock is coarse
+	assert watcher.poll() == [(str(filename), 1)]
+	assert (tmp_path / 'page.html').read_text(encoding='utf-8') == convert_string('# Title\n\nsecond\n')
+
+
+def test_one_bad_file_doesnt_stop_the_others(tmp_path, capsys):
+	bad, good = tmp_path / 'bad.md', tmp_path / 'good.md'
+	bad.write_bytes(b'# \x81 undecodable\n')
+	good.write_text('# Good\n')
+
+	converted = Watcher([str(bad), str(good)]).poll()
+
+	assert converted == [(str(good), 1)]
+	assert (tmp_path / 'good.html').exists()
+	assert 'bad.md: UnicodeDecodeError' in capsys.readouterr().err